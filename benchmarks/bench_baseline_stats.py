@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: EventDetector.update_baseline cost per sample and accuracy against exact NumPy statistics
+Compares the rolling estimators with np.mean/np.std/np.percentile over the same 1000-sample window
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DISTRIBUTIONS = {
+    'poisson(25)': lambda rng, n: rng.poisson(25, n).astype(float),
+    'normal(1000,200)': lambda rng, n: rng.normal(1000, 200, n),
+    'lognormal(3,0.8)': lambda rng, n: rng.lognormal(3, 0.8, n),
+    'level shift': lambda rng, n: np.where(np.arange(n) < n // 2, rng.normal(20, 3, n), rng.normal(60, 5, n)),
+}
+
+def exact_baseline(window: deque) -> dict:
+    values = list(window)
+    return {'mean': np.mean(values), 'std': np.std(values), 'percentile_95': np.percentile(values, 95)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', type=int, default=20000, help='Samples per distribution')
+    parser.add_argument('--check-every', type=int, default=97, help='Compare with the exact values every N samples')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from event_detection_system import EventDetector
+
+    rng = np.random.default_rng(11)
+    print(f"{'distribution':>18} {'us/update':>10} {'exact us':>10} {'mean err':>10} {'std err':>10} "
+          f"{'p95 err':>10} {'p95 avg':>10}")
+    for name, sample in DISTRIBUTIONS.items():
+        values = sample(rng, args.n)
+        detector = EventDetector()
+        window = deque(maxlen=detector.baseline_window)
+        errors = {'mean': 0.0, 'std': 0.0, 'percentile_95': 0.0}
+        p95_total = 0.0
+        rolling_time = exact_time = 0.0
+
+        for i, value in enumerate(values):
+            t0 = time.perf_counter()
+            detector.update_baseline({'metric': value})
+            rolling_time += time.perf_counter() - t0
+            window.append(value)
+
+            if i >= detector.baseline_min_samples and i % args.check_every == 0:
+                t0 = time.perf_counter()
+                exact = exact_baseline(window)
+                exact_time += time.perf_counter() - t0
+                baseline = detector.baseline_metrics['metric']
+                # Errors relative to the window's spread, so every distribution is on the same scale
+                scale = exact['std'] or 1.0
+                for key in errors:
+                    errors[key] = max(errors[key], abs(baseline[key] - exact[key]) / scale)
+                p95_total += abs(baseline['percentile_95'] - exact['percentile_95']) / scale
+
+        checks = max(1, (args.n - detector.baseline_min_samples) // args.check_every)
+        print(f"{name:>18} {rolling_time / args.n * 1e6:>10.2f} {exact_time / checks * 1e6:>10.1f} "
+              f"{errors['mean']:>10.2e} {errors['std']:>10.2e} {errors['percentile_95']:>10.3f} "
+              f"{p95_total / checks:>10.3f}")
+    print("errors: max (avg for p95 avg) of |estimate - exact| / window std")
+
+if __name__ == "__main__":
+    main()
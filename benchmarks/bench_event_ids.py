@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: event ID generation cost and collisions, previous md5-of-clock IDs vs EventIdGenerator
+IDs are drawn in a tight loop, as a batch of detections would
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def clock_md5_id() -> str:
+    """The previous _generate_event_id"""
+    return hashlib.md5(f"{datetime.now().isoformat()}{time.time()}".encode()).hexdigest()[:12]
+
+def measure(label: str, generate, n: int):
+    start = time.perf_counter()
+    ids = [generate() for _ in range(n)]
+    elapsed = time.perf_counter() - start
+    ordered = all(a < b for a, b in zip(ids, ids[1:]))
+    print(f"{label:>16} {elapsed / n * 1e6:>8.2f} {n - len(set(ids)):>12,} {str(ordered):>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', type=int, default=500000, help='IDs per generator')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from event_detection_system import EventIdGenerator
+
+    print(f"{'generator':>16} {'us/id':>8} {'collisions':>12} {'increasing':>10}")
+    measure('md5 of clock', clock_md5_id, args.n)
+    measure('EventIdGenerator', EventIdGenerator(), args.n)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: event ingest rate and event-loop stalls for EventStore vs a connection-per-event store
+Events are stored from a coroutine while a heartbeat task measures how late the loop wakes it
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def store_per_event(db_path: str, event, dumps):
+    """The previous store_event SQLite path: one connection and commit per event"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            event_id TEXT PRIMARY KEY, event_type TEXT, severity TEXT, timestamp TEXT,
+            source TEXT, data TEXT, metadata TEXT
+        )
+    """)
+    conn.execute("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", (
+        event.event_id, event.event_type.value, event.severity.value, event.timestamp.isoformat(),
+        event.source, dumps(event.data), dumps(event.metadata)
+    ))
+    conn.commit()
+    conn.close()
+
+async def heartbeat(interval: float, lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - expected)
+
+async def run(label: str, events, store, interval: float = 0.005, yield_every: int = 100):
+    lags = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(interval, lags, stop))
+    start = time.perf_counter()
+    for i, event in enumerate(events):
+        store(event)
+        if i % yield_every == 0:
+            await asyncio.sleep(0)  # Let other tasks run, as a detection loop would
+    return start, lags, stop, beat
+
+def report(label: str, count: int, elapsed: float, lags: list):
+    lags = sorted(lags) or [0.0]
+    p99 = lags[int(len(lags) * 0.99)] * 1000
+    print(f"{label:>22} {count / elapsed:>12,.0f} {p99:>12.1f} {lags[-1] * 1000:>12.1f}")
+
+async def main_async(args):
+    import json_codec
+    from event_detection_system import Event, EventStore, EventType, Severity
+
+    events = [Event(
+        event_id=f"evt{i:012d}",
+        event_type=EventType.ODDS_CHANGE,
+        severity=Severity.MEDIUM,
+        timestamp=datetime.now(),
+        source='odds_monitor',
+        data={'match_id': f"match_{i % 500}", 'old_odds': 1.9, 'new_odds': 2.3, 'change_percent': 21.0},
+        metadata={'rule': 'odds_change_detection'}
+    ) for i in range(args.events)]
+
+    print(f"{'store':>22} {'events/s':>12} {'p99 stall ms':>12} {'max stall ms':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = os.path.join(tmp, 'legacy.db')
+        legacy = events[:args.legacy_events]
+        start, lags, stop, beat = await run('per-event connection', legacy,
+                                            lambda e: store_per_event(legacy_db, e, json_codec.dumps))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await beat
+        report('per-event connection', len(legacy), elapsed, lags)
+
+        store = EventStore(os.path.join(tmp, 'events.db'))
+        start, lags, stop, beat = await run('EventStore', events, store.store)
+        await asyncio.wrap_future(store.flush())
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await beat
+        store.close()
+        report('EventStore (durable)', len(events), elapsed, lags)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--legacy-events', type=int, default=2000, help='Events for the slow per-event path')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: tshark frame.time parsing
+Compares parse_frame_time with datetime.strptime and the frame.time_epoch float path
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def make_values(n: int):
+    """Consecutive capture times over a few days, as tshark prints them"""
+    base = 1759470966.797552
+    values, epochs = [], []
+    for i in range(n):
+        ts = base + i * 0.0037
+        dt = datetime.fromtimestamp(ts - 4 * 3600, timezone.utc)
+        values.append(f"{dt:%b} {dt.day:>2}, {dt:%Y %H:%M:%S}.{dt.microsecond:06d}000 EDT")
+        epochs.append(f"{ts:.6f}")
+    return values, epochs
+
+def strptime_parse(value: str) -> float:
+    # strptime only handles microseconds and no zone abbreviations
+    head, _, _ = value.rpartition(' ')
+    return datetime.strptime(head[:-3], '%b %d, %Y %H:%M:%S.%f').timestamp()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', type=int, default=300000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        from ml_pattern_engine import parse_frame_time
+
+        values, epochs = make_values(args.n)
+        runs = [
+            ('parse_frame_time', parse_frame_time, values),
+            ('datetime.strptime', strptime_parse, values),
+            ('float(frame.time_epoch)', float, epochs),
+        ]
+        print(f"{'parser':>24} {'values/s':>14}")
+        for name, func, inputs in runs:
+            start = time.perf_counter()
+            for value in inputs:
+                func(value)
+            elapsed = time.perf_counter() - start
+            print(f"{name:>24} {len(inputs) / elapsed:>14,.0f}")
+
+        # The fast path must agree with the exported epoch to the microsecond
+        for value, epoch in zip(values[::997], epochs[::997]):
+            assert abs(parse_frame_time(value) - float(epoch)) < 1e-5, (value, epoch)
+
+if __name__ == "__main__":
+    main()
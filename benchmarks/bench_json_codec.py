@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: JSON codec backends
+Reports packets decoded per second and events encoded per second for every installed backend
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import json_codec
+
+@dataclass
+class _Sample:
+    match_id: str
+    odds: float
+
+def make_packet_lines(n: int):
+    """Synthetic tshark JSONL lines shaped like realtime_packets.jsonl"""
+    return [json.dumps({'_source': {'layers': {
+        'frame': {'frame.time': 'Oct  3, 2025 01:56:06.797552000 EDT', 'frame.time_epoch': f'{1759470966.797552 + i:.6f}'},
+        'ip': {'ip.src': '10.0.0.2', 'ip.dst': '104.18.0.1'},
+        'tcp': {'tcp.dstport': '443'},
+        'http': {'http.request.method': 'GET', 'http.request.uri': f'/api/v1/odds?match_id={i % 500}&odds={1.5 + i % 40 / 10}'},
+    }}}).encode() + b'\n' for i in range(n)]
+
+def make_events(n: int):
+    """Event payloads shaped like Event.to_dict(), with datetimes and dataclasses left for default=str"""
+    return [{
+        'event_id': f'{i:012x}',
+        'event_type': 'odds_change',
+        'severity': 'HIGH',
+        'timestamp': datetime.now().isoformat(),
+        'source': 'odds_monitor',
+        'data': {'match_id': f'match_{i % 100}', 'old_odds': 2.1, 'new_odds': 2.6,
+                 'change_percent': 23.8, 'observed_at': datetime.now(), 'sample': _Sample(str(i), 2.6)},
+        'metadata': {'rule': 'odds_change_detection'},
+    } for i in range(n)]
+
+def rate(func, items, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return len(items) / best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', type=int, default=100000, help='Items per measurement')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    lines = make_packet_lines(args.n)
+    events = make_events(args.n)
+
+    print(f"selected: decoder={json_codec.DECODER} encoder={json_codec.ENCODER}")
+    print(f"{'backend':>10} {'decode pkts/s':>15} {'encode events/s':>17}")
+    for name in sorted(set(json_codec.DECODERS) | set(json_codec.ENCODERS)):
+        decoder = json_codec.DECODERS.get(name)
+        encoder = json_codec.ENCODERS.get(name)
+        decoded = f"{rate(decoder, lines, args.repeat):>15,.0f}" if decoder else f"{'-':>15}"
+        encoded = f"{rate(encoder, events, args.repeat):>17,.0f}" if encoder else f"{'-':>17}"
+        print(f"{name:>10} {decoded} {encoded}")
+
+    # Encoders must agree with the stdlib once whitespace is normalized
+    reference = json.loads(json_codec.ENCODERS['stdlib'](events[0]))
+    for name, encoder in json_codec.ENCODERS.items():
+        assert json.loads(encoder(events[0])) == reference, f"{name} output differs from stdlib"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: OddsArchive append throughput and memory-mapped range scans
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from odds_archive import OddsArchive
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', type=int, default=20000000, help='Rows to archive')
+    parser.add_argument('--days', type=int, default=30, help='Days the rows are spread over')
+    parser.add_argument('--batch', type=int, default=1000000, help='Rows per append call')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    start_ms = 1759276800000  # 2025-10-01T00:00:00Z
+    span_ms = args.days * 86400 * 1000
+    match_ids = [str(m) for m in range(20000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = OddsArchive(os.path.join(tmp, 'archive'))
+
+        t0 = time.perf_counter()
+        for lo in range(0, args.n, args.batch):
+            n = min(args.batch, args.n - lo)
+            ts = start_ms + (lo + np.arange(n)) * (span_ms // args.n)
+            matches = rng.integers(0, len(match_ids), n)
+            new = rng.uniform(1.2, 6.0, n)
+            archive.append(ts, [match_ids[m] for m in matches], ['live_betting'] * n,
+                           new * 0.95, new, np.full(n, 0.05))
+        append = time.perf_counter() - t0
+
+        # A one-week window in the middle of the archive
+        lo_ms = start_ms + span_ms // 2
+        hi_ms = lo_ms + 7 * 86400 * 1000
+        t0 = time.perf_counter()
+        rows = 0
+        total = 0.0
+        for columns in archive.iter_segments(lo_ms, hi_ms):
+            rows += len(columns['ts'])
+            total += float(columns['magnitude'].sum())
+        scan = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        single = archive.scan(start_ms, start_ms + span_ms, match_id='42')
+        match_scan = time.perf_counter() - t0
+
+    print(f"rows archived:       {args.n:,} over {args.days} days")
+    print(f"append:              {append:.2f}s ({args.n / append:,.0f} rows/s)")
+    print(f"1-week range scan:   {rows:,} rows in {scan:.3f}s ({rows / scan:,.0f} rows/s)")
+    print(f"full-span one match: {len(single['ts']):,} rows in {match_scan:.3f}s")
+
+if __name__ == "__main__":
+    main()
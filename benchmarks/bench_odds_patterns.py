@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: PatternAnalysisEngine._detect_odds_patterns over a large batch of odds changes
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', type=int, default=1000000, help='Odds changes per pass')
+    parser.add_argument('--matches', type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        from ml_pattern_engine import OddsChange, PatternAnalysisEngine, detect_rapid_moves
+
+        rng = np.random.default_rng(7)
+        start = datetime.now() - timedelta(hours=6)
+        offsets = np.sort(rng.uniform(0, 6 * 3600, args.n))
+        matches = rng.integers(0, args.matches, args.n)
+        prices = rng.uniform(1.2, 6.0, args.n)
+        markets = ('live_betting', 'pre_match')
+
+        # Previous price and sighting per market, as OddsStateStore would report them
+        groups = matches * 2 + (np.arange(args.n) & 1)
+        order = np.lexsort((offsets, groups))
+        old_odds = np.full(args.n, np.nan)
+        elapsed = np.full(args.n, np.nan)
+        same = groups[order[1:]] == groups[order[:-1]]
+        old_odds[order[1:][same]] = prices[order[:-1][same]]
+        elapsed[order[1:][same]] = offsets[order[1:][same]] - offsets[order[:-1][same]]
+        changed = np.flatnonzero(~np.isnan(old_odds))
+
+        changes = [OddsChange(
+            timestamp=start + timedelta(seconds=float(offsets[i])),
+            match_id=str(matches[i]),
+            market_type=markets[i & 1],
+            old_odds=float(old_odds[i]),
+            new_odds=float(prices[i]),
+            change_magnitude=abs(float(prices[i]) - float(old_odds[i])) / float(old_odds[i]),
+            source_ip='10.0.0.2',
+            api_endpoint='/api/v1/odds',
+            elapsed=float(elapsed[i])
+        ) for i in changed]
+
+        engine = PatternAnalysisEngine(db_path=os.path.join(tmp, 'bench.db'))
+
+        t0 = time.perf_counter()
+        engine._detect_odds_patterns({'odds_changes': changes})
+        full = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        hits, _ = detect_rapid_moves(old_odds[changed], prices[changed], elapsed[changed],
+                                     engine.rapid_move_window, engine.odds_threshold)
+        kernel = time.perf_counter() - t0
+        engine.close()
+
+    print(f"odds changes:            {len(changes):,}")
+    print(f"rapid moves found:       {len(hits):,}")
+    print(f"_detect_odds_patterns:   {full:.3f}s ({len(changes) / full:,.0f} changes/s)")
+    print(f"detect_rapid_moves only: {kernel:.3f}s ({len(changes) / kernel:,.0f} changes/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: odds_changes / competitor_activity insert throughput
+Compares the old connect-insert-commit-per-batch path with PatternStore group commits
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def make_rows(n: int):
+    """Rows in PatternStore.INSERT_SQL column order, ending with ts_epoch_ms"""
+    captured = datetime.now()
+    now, now_ms = captured.isoformat(), int(captured.timestamp() * 1000)
+    odds = [(now, str(i % 500), 'live_betting', 2.0, 2.1, 0.05, '10.0.0.2', f'/api/v1/odds?match_id={i % 500}', now_ms)
+            for i in range(n)]
+    activity = [('www.betika.com', now, 'tls_handshake', 1, json.dumps({'ip': '104.18.0.1'}), now_ms)
+                for _ in range(n // 10)]
+    return odds, activity
+
+def legacy_insert(db_path: str, odds, activity, batch: int):
+    """Old _store_analysis_results behaviour: new connection, row-by-row execute, commit per call
+
+    The old statements had no ts_epoch_ms column, so it is left off each row.
+    """
+    for start in range(0, len(odds), batch):
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        for row in odds[start:start + batch]:
+            cursor.execute("""
+                INSERT INTO odds_changes
+                (timestamp, match_id, market_type, old_odds, new_odds, change_magnitude, source_ip, api_endpoint)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, row[:-1])
+        for row in activity[start // 10:(start + batch) // 10]:
+            cursor.execute("""
+                INSERT INTO competitor_activity (domain, timestamp, activity_type, frequency, details)
+                VALUES (?, ?, ?, ?, ?)
+            """, row[:-1])
+        conn.commit()
+        conn.close()
+
+def store_insert(store, odds, activity, batch: int):
+    """PatternStore path: same call pattern, buffered and group-committed"""
+    for start in range(0, len(odds), batch):
+        store.add('odds_changes', odds[start:start + batch])
+        store.add('competitor_activity', activity[start // 10:(start + batch) // 10])
+    store.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', type=int, default=200000, help='odds_changes rows to insert')
+    parser.add_argument('--batch', type=int, default=10, help='Rows per _store_analysis_results call')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    odds, activity = make_rows(args.n)
+    total = len(odds) + len(activity)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        from ml_pattern_engine import PatternAnalysisEngine
+
+        legacy_db = os.path.join(tmp, 'legacy.db')
+        PatternAnalysisEngine(db_path=legacy_db).close()
+        # The legacy path ran with SQLite defaults (rollback journal, synchronous=FULL)
+        conn = sqlite3.connect(legacy_db)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+        start = time.perf_counter()
+        legacy_insert(legacy_db, odds, activity, args.batch)
+        legacy = time.perf_counter() - start
+
+        engine = PatternAnalysisEngine(db_path=os.path.join(tmp, 'store.db'))
+        start = time.perf_counter()
+        store_insert(engine.store, odds, activity, args.batch)
+        buffered = time.perf_counter() - start
+        engine.close()
+
+    print(f"{'path':>14} {'rows':>9} {'seconds':>8} {'rows/s':>12}")
+    print(f"{'legacy':>14} {total:>9} {legacy:>8.2f} {total / legacy:>12,.0f}")
+    print(f"{'PatternStore':>14} {total:>9} {buffered:>8.2f} {total / buffered:>12,.0f}")
+    print(f"speedup: {legacy / buffered:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: Redis writes per event (setex, lpush, ltrim) vs RedisEventSink pipelined batches (setex, xadd)
+Uses an in-process stand-in client that charges a fixed round-trip time per command or pipeline
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+class StandInPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = 0
+
+    def setex(self, *args):
+        self.commands += 1
+
+    def xadd(self, *args, **kwargs):
+        self.commands += 1
+
+    async def execute(self):
+        await self.client.round_trip()
+        self.client.commands += self.commands
+
+class StandInRedis:
+    """Stand-in for redis.asyncio.Redis: every round trip costs rtt seconds"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.round_trips = 0
+        self.commands = 0
+
+    async def round_trip(self):
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt)
+
+    def pipeline(self, transaction=True):
+        return StandInPipeline(self)
+
+    async def aclose(self):
+        pass
+
+async def per_event(client: StandInRedis, events, dumps):
+    """The previous store_event Redis path: three round trips per event"""
+    for event in events:
+        payload = dumps(event.to_dict())
+        for _ in range(3):
+            await client.round_trip()
+            client.commands += 1
+        del payload
+
+async def main_async(args):
+    import json_codec
+    from event_detection_system import Event, EventType, RedisEventSink, Severity
+
+    events = [Event(
+        event_id=f"evt{i:012d}",
+        event_type=EventType.ODDS_CHANGE if i % 3 else EventType.API_SPIKE,
+        severity=Severity.MEDIUM,
+        timestamp=datetime.now(),
+        source='odds_monitor',
+        data={'match_id': f"match_{i % 500}", 'old_odds': 1.9, 'new_odds': 2.3},
+        metadata={}
+    ) for i in range(args.events)]
+    rtt = args.rtt_ms / 1000
+
+    print(f"{'path':>14} {'events/s':>12} {'round trips':>12} {'commands':>10} {'dropped':>8}")
+    client = StandInRedis(rtt)
+    legacy = events[:args.legacy_events]
+    start = time.perf_counter()
+    await per_event(client, legacy, json_codec.dumps)
+    elapsed = time.perf_counter() - start
+    print(f"{'per-event':>14} {len(legacy) / elapsed:>12,.0f} {client.round_trips:>12,} {client.commands:>10,} {0:>8,}")
+
+    client = StandInRedis(rtt)
+    sink = RedisEventSink(client=client, batch_size=args.batch_size, buffer_limit=args.buffer_limit)
+    start = time.perf_counter()
+    for i, event in enumerate(events):
+        sink.publish(event)
+        if i % 100 == 0:
+            await asyncio.sleep(0)  # Yield as the detection loop would
+    await sink.close()
+    elapsed = time.perf_counter() - start
+    print(f"{'RedisEventSink':>14} {len(events) / elapsed:>12,.0f} {client.round_trips:>12,} {client.commands:>10,} {sink.dropped:>8,}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=50000)
+    parser.add_argument('--legacy-events', type=int, default=1000, help='Events for the per-event path')
+    parser.add_argument('--rtt-ms', type=float, default=0.5, help='Simulated round-trip time')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--buffer-limit', type=int, default=100000, help='Sink buffer; smaller values drop events')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
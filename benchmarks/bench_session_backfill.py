@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: multi-session backfill throughput of PatternAnalysisEngine.analyze_sessions
+Parses the same set of synthetic session directories with increasing worker counts
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_streaming_parser import write_packets
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sessions', type=int, default=16, help='Number of session directories')
+    parser.add_argument('--session-mb', type=int, default=8, help='Size of each session file in MB')
+    parser.add_argument('--workers', default=f'1,2,4,{os.cpu_count()}', help='Comma-separated worker counts')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        logging.disable(logging.WARNING)
+        from ml_pattern_engine import PatternAnalysisEngine
+
+        for i in range(args.sessions):
+            session_dir = os.path.join(tmp, f'realtime_analysis_{i:04d}')
+            os.makedirs(session_dir)
+            write_packets(os.path.join(session_dir, 'realtime_packets.jsonl'), args.session_mb)
+        pattern = os.path.join(tmp, 'realtime_analysis_*', 'realtime_packets.jsonl')
+
+        print(f"{'workers':>8} {'packets':>10} {'seconds':>8} {'pkts/s':>10} {'speedup':>8}")
+        baseline = None
+        for workers in sorted({int(w) for w in args.workers.split(',')}):
+            # Fresh database each run so every file is parsed from byte 0
+            engine = PatternAnalysisEngine(db_path=os.path.join(tmp, f'bench_{workers}.db'))
+            start = time.perf_counter()
+            results = engine.analyze_sessions(pattern, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {results['total_packets']:>10} {elapsed:>8.2f} "
+                  f"{results['total_packets'] / elapsed:>10.0f} {baseline / elapsed:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
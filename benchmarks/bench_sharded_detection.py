@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: single-process detection vs ShardedDetector with 1..N worker processes
+Also checks that every match's odds_change events come back in the same order as single-process detection
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def odds_sequences(events) -> dict:
+    """Per match, the odds changes in the order they were reported"""
+    sequences = defaultdict(list)
+    for event in events:
+        if event.event_type.value == 'odds_change':
+            sequences[event.data['match_id']].append((event.data['old_odds'], event.data['new_odds']))
+    return sequences
+
+class Collecting:
+    """Stands in for the pipeline on the front side, keeping returned events"""
+
+    def __init__(self):
+        self.events = []
+
+    def store_events(self, events):
+        self.events.extend(events)
+        return events
+
+    async def broadcast_event(self, event):
+        pass
+
+async def run_sharded(records, shards: int, chunk_size: int):
+    from event_detection_system import ShardedDetector
+
+    front = Collecting()
+    sharded = ShardedDetector(front, shards, chunk_size=chunk_size)
+    sharded.start()
+    # Workers import the detection stack on start; time only the steady state
+    await sharded.submit({'match_id': 'warmup'})
+    await sharded.flush()
+    front.events.clear()
+
+    start = time.perf_counter()
+    for record in records:
+        await sharded.submit(record)
+    await sharded.flush()
+    elapsed = time.perf_counter() - start
+    await sharded.close()
+    return elapsed, front.events
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', type=int, default=100000, help='Records')
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--chunk-size', type=int, default=256)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from bench_batch_detection import make_records
+    from event_detection_system import RealTimeDataPipeline
+
+    records = make_records(args.n)
+    pipeline = RealTimeDataPipeline(redis_host=None, db_path=None)
+    start = time.perf_counter()
+    single = [event for record in records for event in pipeline.detect(record)]
+    single_time = time.perf_counter() - start
+    expected = odds_sequences(single)
+
+    print(f"cpus: {os.cpu_count()}")
+    print(f"{'detector':>16} {'records/s':>12} {'speedup':>8} {'events':>8} {'ordered':>8}")
+    print(f"{'single process':>16} {args.n / single_time:>12,.0f} {1:>7.2f}x {len(single):>8,} {'-':>8}")
+    for shards in args.shards:
+        elapsed, events = asyncio.run(run_sharded(records, shards, args.chunk_size))
+        ordered = odds_sequences(events) == expected
+        print(f"{f'{shards} shards':>16} {args.n / elapsed:>12,.0f} {single_time / elapsed:>7.2f}x "
+              f"{len(events):>8,} {str(ordered):>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: event stream throughput vs number of EventStreamWorker processes in one consumer group
+Needs a running Redis; fills the odds_change stream, then drains it with 1..N worker processes
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STREAM = 'bench_event_stream:odds_change'
+
+def simulated_work(event, rounds: int):
+    """CPU-bound stand-in for downstream handling (storage, enrichment, reporting)"""
+    digest = event.event_id.encode()
+    for _ in range(rounds):
+        digest = hashlib.sha256(digest).digest()
+    return digest
+
+async def drain(args, group: str, consumer: str) -> tuple:
+    from event_detection_system import EventStreamWorker, connect_redis
+
+    stats = {'first': None, 'last': None}
+
+    async def handle(events):
+        stats['first'] = stats['first'] or time.perf_counter()
+        for event in events:
+            simulated_work(event, args.work_rounds)
+        stats['last'] = time.perf_counter()
+
+    client = connect_redis(args.redis_host, args.redis_port, timeout=5.0)
+    worker = EventStreamWorker(client, handle, group=group, consumer=consumer, streams=[STREAM],
+                               batch_size=args.batch_size, block_ms=200)
+
+    async def stop_when_idle():
+        started = time.perf_counter()
+        while time.perf_counter() - (stats['last'] or started) < 1.0:
+            await asyncio.sleep(0.2)
+        worker.stop()
+
+    watcher = asyncio.create_task(stop_when_idle())
+    await worker.run()
+    await watcher
+    await client.aclose()
+    return worker.processed, stats['first'], stats['last']
+
+def worker_process(args, group: str, consumer: str, results):
+    logging.disable(logging.WARNING)
+    results.put(asyncio.run(drain(args, group, consumer)))
+
+async def fill(args):
+    import json_codec
+    from event_detection_system import Event, EventType, Severity, connect_redis
+
+    client = connect_redis(args.redis_host, args.redis_port, timeout=5.0)
+    await client.delete(STREAM)
+    for lo in range(0, args.events, 1000):
+        pipe = client.pipeline(transaction=False)
+        for i in range(lo, min(lo + 1000, args.events)):
+            event = Event(
+                event_id=f"evt{i:012d}",
+                event_type=EventType.ODDS_CHANGE,
+                severity=Severity.MEDIUM,
+                timestamp=datetime.now(),
+                source='odds_monitor',
+                data={'match_id': f"match_{i % 500}", 'old_odds': 1.9, 'new_odds': 2.3},
+                metadata={}
+            )
+            pipe.xadd(STREAM, {'event': json_codec.dumps(event.to_dict())})
+        await pipe.execute()
+    await client.aclose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--redis-host', default='localhost')
+    parser.add_argument('--redis-port', type=int, default=6379)
+    parser.add_argument('--events', type=int, default=50000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--work-rounds', type=int, default=200, help='sha256 rounds per event')
+    parser.add_argument('--batch-size', type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"{'workers':>8} {'events/s':>12} {'speedup':>8} {'split':>24}")
+    base = None
+    for count in args.workers:
+        asyncio.run(fill(args))
+        results = multiprocessing.Queue()
+        group = f"bench-{count}-{os.getpid()}"
+        procs = [multiprocessing.Process(target=worker_process, args=(args, group, f"w{i}", results))
+                 for i in range(count)]
+        for proc in procs:
+            proc.start()
+        parts = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+        processed = [part[0] for part in parts]
+        spans = [part for part in parts if part[1] is not None]
+        elapsed = max(part[2] for part in spans) - min(part[1] for part in spans)
+        rate = sum(processed) / elapsed
+        base = base or rate
+        print(f"{count:>8} {rate:>12,.0f} {rate / base:>7.2f}x {str(processed):>24}")
+
+if __name__ == "__main__":
+    main()
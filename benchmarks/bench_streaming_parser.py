@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: peak RSS of PatternAnalysisEngine.analyze_http_packets vs input size
+Each file size is analyzed in a fresh child process so peak RSS is not shared
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+URIS = [
+    '/api/v1/live/matches?sport_id=14',
+    '/api/v1/odds?match_id={match}&odds={odds}',
+    '/v1/bet/slip',
+    '/v2/gtr?id=25605&url=https%3A%2F%2Fwww.betika.com%2Fen-ke%2F&t={ts}',
+    '/static/app.js',
+]
+
+def write_packets(path: str, target_mb: int):
+    """Write synthetic tshark-style JSONL packets until the file reaches target_mb"""
+    target = target_mb * 1024 * 1024
+    written = 0
+    i = 0
+    with open(path, 'w') as f:
+        while written < target:
+            uri = URIS[i % len(URIS)].format(match=i % 500, odds=1.5 + (i % 40) / 10, ts=1759458653838 + i)
+            line = json.dumps({'_source': {'layers': {
+                'frame': {'frame.time': 'Oct  3, 2025 01:56:06.797552000 EDT'},
+                'ip': {'ip.src': '10.0.0.2', 'ip.dst': '104.18.0.1'},
+                'http': {'http.request.method': 'GET', 'http.request.uri': uri},
+            }}}) + '\n'
+            f.write(line)
+            written += len(line)
+            i += 1
+    return i
+
+def run_child(packets_file: str, db_path: str):
+    """Analyze one file and print peak RSS in MB as JSON"""
+    sys.path.insert(0, ROOT)
+    import logging
+    logging.disable(logging.WARNING)
+    from ml_pattern_engine import PatternAnalysisEngine
+
+    engine = PatternAnalysisEngine(db_path=db_path)
+    start = time.perf_counter()
+    results = engine.analyze_http_packets(packets_file)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is KB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({'packets': results['total_packets'], 'seconds': elapsed, 'peak_rss_mb': peak_mb}))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='16,64,256', help='Comma-separated file sizes in MB')
+    parser.add_argument('--child', nargs=2, metavar=('PACKETS', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    print(f"{'size_mb':>8} {'packets':>10} {'seconds':>8} {'pkts/s':>10} {'peak_rss_mb':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in [int(s) for s in args.sizes.split(',')]:
+            packets_file = os.path.join(tmp, f'packets_{size_mb}mb.jsonl')
+            write_packets(packets_file, size_mb)
+            out = subprocess.run(
+                [sys.executable, __file__, '--child', packets_file, os.path.join(tmp, 'bench.db')],
+                cwd=tmp, capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            r = json.loads(out)
+            print(f"{size_mb:>8} {r['packets']:>10} {r['seconds']:>8.2f} {r['packets'] / r['seconds']:>10.0f} {r['peak_rss_mb']:>12.1f}")
+            os.remove(packets_file)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+"""
+Phase 2: Historical Capture Importer
+Streams pipe-delimited tshark field exports from captures/automated_analysis_*/ into the pattern engine
+"""
+
+import argparse
+import csv
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ml_pattern_engine import PacketFileTailer, PatternAnalysisEngine, merge_analysis_results, parse_frame_time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATTERN = "captures/automated_analysis_*"
+
+# combined_requests.csv and http3_summary.csv repeat rows from http_summary.csv
+# and http3_raw.csv; each is only read when its richer counterpart is missing
+SOURCES = (
+    ('http_summary.csv', None),
+    ('combined_requests.csv', 'http_summary.csv'),
+    ('http3_raw.csv', None),
+    ('http3_summary.csv', 'http3_raw.csv'),
+    ('ws_summary.csv', None),
+)
+
+def _frame(row: Dict[str, str], time_field: str) -> Dict:
+    value = row.get(time_field) or ''
+    frame = {'frame.time': value}
+    if value:
+        try:
+            frame['frame.time_epoch'] = f"{parse_frame_time(value):.6f}"
+        except (ValueError, KeyError, IndexError):
+            # Unknown zone names etc.: keep the row, timed as _capture_time falls back
+            logger.debug(f"Unparseable frame.time: {value}")
+    return frame
+
+def _http_summary_packet(row: Dict[str, str]) -> Dict:
+    return {
+        'frame': _frame(row, 'frame.time'),
+        'http': {
+            'http.host': row.get('http.host', ''),
+            'http.request.method': row.get('http.request.method') or 'GET',
+            'http.request.uri': row.get('http.request.uri', ''),
+            'http.response.code': row.get('http.response.code', ''),
+        },
+    }
+
+def _combined_requests_packet(row: Dict[str, str]) -> Optional[Dict]:
+    if row.get('protocol') != 'HTTP':
+        return None  # HTTP/3 rows are covered by the http3 exports
+    return {
+        'frame': _frame(row, 'timestamp'),
+        'http': {
+            'http.host': row.get('host', ''),
+            'http.request.method': row.get('method') or 'GET',
+            'http.request.uri': row.get('uri', ''),
+            'http.response.code': row.get('status', ''),
+        },
+    }
+
+def _http3_raw_packet(row: Dict[str, str]) -> Dict:
+    layers = {
+        'frame': _frame(row, 'frame.time'),
+        'quic': {
+            'quic.dcid': row.get('quic.dcid', ''),
+            'quic.header_form': row.get('quic.header_form', ''),
+            'quic.long.packet_type': row.get('quic.long.packet_type', ''),
+        },
+    }
+    if row.get('tls.handshake.extensions_server_name'):
+        layers['tls'] = {'tls.handshake.extensions_server_name': row['tls.handshake.extensions_server_name']}
+    return layers
+
+def _http3_summary_packet(row: Dict[str, str]) -> Dict:
+    layers = {'frame': _frame(row, 'frame.time'), 'quic': {}}
+    if row.get('authority'):
+        layers['tls'] = {'tls.handshake.extensions_server_name': row['authority']}
+    return layers
+
+def _ws_summary_packet(row: Dict[str, str]) -> Dict:
+    return {
+        'frame': _frame(row, 'frame.time'),
+        'ip': {'ip.src': row.get('ip.src', ''), 'ip.dst': row.get('ip.dst', '')},
+        'tcp': {'tcp.srcport': row.get('tcp.srcport', ''), 'tcp.dstport': row.get('tcp.dstport', '')},
+        'websocket': {
+            'websocket.fin': row.get('websocket.fin', ''),
+            'websocket.opcode': row.get('websocket.opcode', ''),
+            'websocket.payload_length': row.get('websocket.payload_length', ''),
+        },
+    }
+
+ROW_ADAPTERS = {
+    'http_summary.csv': _http_summary_packet,
+    'combined_requests.csv': _combined_requests_packet,
+    'http3_raw.csv': _http3_raw_packet,
+    'http3_summary.csv': _http3_summary_packet,
+    'ws_summary.csv': _ws_summary_packet,
+}
+
+def iter_capture_packets(csv_path: str) -> Iterator[Dict]:
+    """Stream a pipe-delimited tshark export as tshark -T json style packets"""
+    adapter = ROW_ADAPTERS[os.path.basename(csv_path)]
+    skipped = 0
+    with open(csv_path, 'r', newline='', encoding='utf-8', errors='replace') as f:
+        for row in csv.DictReader(f, delimiter='|', quoting=csv.QUOTE_NONE):
+            try:
+                layers = adapter(row)
+            except (ValueError, KeyError, IndexError) as e:
+                logger.debug(f"Skipping malformed row in {csv_path}: {e}")
+                skipped += 1
+                continue
+            if layers is not None:
+                yield {'_source': {'layers': layers}}
+    if skipped:
+        logger.warning(f"Skipped {skipped} malformed rows in {csv_path}")
+
+def capture_files(directory: str) -> List[str]:
+    """CSV exports to read from one capture directory, skipping redundant ones"""
+    present = {name for name, _ in SOURCES if os.path.exists(os.path.join(directory, name))}
+    return [os.path.join(directory, name) for name, covered_by in SOURCES
+            if name in present and covered_by not in present]
+
+_worker_engine = None
+
+def _init_worker(db_path: str):
+    """Create the per-process engine used by import workers"""
+    global _worker_engine
+    _worker_engine = PatternAnalysisEngine(db_path=db_path)
+
+def _import_directory(directory: str, files: List[Tuple[str, int, int]],
+                      engine: Optional[PatternAnalysisEngine] = None) -> Tuple[Dict, List[PacketFileTailer]]:
+    """Worker entry point: classify every packet in one capture directory"""
+    in_worker = engine is None
+    engine = engine or _worker_engine
+    results = engine._new_results()
+    if in_worker:
+        engine._fresh_stream_state(results)
+
+    checkpoints = []
+    for path, inode, size in files:
+        for packet in iter_capture_packets(path):
+            results['total_packets'] += 1
+            try:
+                engine._process_packet(packet, results)
+            except Exception as e:
+                logger.error(f"Error processing packet from {path}: {e}")
+        checkpoints.append(PacketFileTailer(path, inode, size))
+    return results, checkpoints
+
+def import_captures(engine: PatternAnalysisEngine, pattern: str = DEFAULT_PATTERN,
+                    max_workers: Optional[int] = None) -> Dict:
+    """Import every capture directory matching pattern, one directory per worker process
+
+    Files already imported at their current size are skipped, so re-running
+    a backfill only picks up new or changed exports.
+    """
+    jobs = []
+    for directory in sorted(glob.glob(pattern)):
+        if not os.path.isdir(directory):
+            continue
+        pending = []
+        for path in capture_files(directory):
+            st = os.stat(path)
+            tailer = engine._get_tailer(path)
+            if st.st_size and (tailer.inode != st.st_ino or tailer.offset != st.st_size):
+                pending.append((path, st.st_ino, st.st_size))
+        if pending:
+            jobs.append((directory, pending))
+
+    results = engine._new_results()
+    results['checkpoints'] = []
+    if not jobs:
+        logger.info("No new capture exports to import")
+        return results
+
+    logger.info(f"Importing {len(jobs)} capture directories")
+    if len(jobs) == 1 or max_workers == 1:
+        partials = [_import_directory(directory, files, engine=engine) for directory, files in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(engine.db_path,)) as pool:
+            partials = list(pool.map(_import_directory, *zip(*jobs)))
+
+    for partial, checkpoints in partials:
+        engine._merge_stream_state(partial)
+        merge_analysis_results(results, partial)
+        for tailer in checkpoints:
+            engine.tailers[tailer.path] = tailer
+        results['checkpoints'].extend(checkpoints)
+
+    engine._run_detectors(results)
+    engine._store_analysis_results(results)
+    return results
+
+def main():
+    """Backfill historical captures into the pattern database"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('pattern', nargs='?', default=DEFAULT_PATTERN, help='Glob of capture directories')
+    parser.add_argument('--db', default='pattern_analysis.db', help='Pattern database path')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    engine = PatternAnalysisEngine(db_path=args.db)
+    start = time.perf_counter()
+    try:
+        results = import_captures(engine, args.pattern, args.workers)
+    finally:
+        engine.close()
+
+    logger.info(f"Imported {results['total_packets']} packets from {len(results['checkpoints'])} files "
+                f"in {time.perf_counter() - start:.2f}s: {results['betting_events']} betting events, "
+                f"{len(results['odds_changes'])} odds changes")
+
+if __name__ == "__main__":
+    main()
@@ -5,24 +5,33 @@ Phase 2: Advanced Event Detection System
 Real-time event detection, streaming data pipeline, and competitive intelligence alerts
 """
 
+import argparse
 import asyncio
 import json
+import os
+import socket
 import websockets
 import sqlite3
-import redis
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Callable
 from dataclasses import dataclass, asdict
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 import logging
 import threading
+import queue
+from concurrent.futures import Future
 import time
 from enum import Enum
 import numpy as np
 from scipy import stats
 import hashlib
+import math
+import multiprocessing
+import zlib
 import requests
 
+import json_codec
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -50,6 +59,7 @@ class Event:
     source: str
     data: Dict
     metadata: Dict
+    idempotency_key: Optional[str] = None  # Same source record and rule -> same key
     
     def to_dict(self):
         return {
@@ -59,28 +69,379 @@ class Event:
             'timestamp': self.timestamp.isoformat(),
             'source': self.source,
             'data': self.data,
-            'metadata': self.metadata
+            'metadata': self.metadata,
+            'idempotency_key': self.idempotency_key
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Event':
+        """Inverse of to_dict"""
+        return cls(
+            event_id=data['event_id'],
+            event_type=EventType(data['event_type']),
+            severity=Severity(data['severity']),
+            timestamp=datetime.fromisoformat(data['timestamp']),
+            source=data['source'],
+            data=data.get('data') or {},
+            metadata=data.get('metadata') or {},
+            idempotency_key=data.get('idempotency_key')
+        )
+
+_CROCKFORD32 = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+class EventIdGenerator:
+    """Monotonic, time-sortable event IDs in the ULID layout
+    
+    48 bits of Unix milliseconds followed by 80 random bits, written as 26
+    Crockford base32 characters, so IDs sort by creation time. Within one
+    millisecond the random part is incremented instead of redrawn, which
+    keeps IDs from one process strictly increasing even if the clock
+    steps back. A forked child redraws before its first ID; processes
+    therefore only collide if two 80-bit draws land within a few
+    increments of each other.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self._last_ms = -1
+        self._random = 0
+    
+    def __call__(self) -> str:
+        with self._lock:
+            now = time.time_ns() // 1000000
+            if now > self._last_ms:
+                self._last_ms = now
+                self._random = int.from_bytes(os.urandom(10), 'big')
+            else:
+                self._random += 1
+                if self._random >> 80:  # Exhausted this millisecond; borrow the next one
+                    self._last_ms += 1
+                    self._random = 0
+            value = (self._last_ms << 80) | self._random
+        return ''.join(_CROCKFORD32[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+generate_event_id = EventIdGenerator()
+os.register_at_fork(after_in_child=generate_event_id.reset)
+
+# Fields identifying a source record: an upstream record id or sequence
+# number, or the time the record was captured
+IDENTITY_FIELDS = ('record_id', 'sequence', 'seq', 'timestamp', 'captured_at')
+
+def _canonical_value(value):
+    """Value as hashed into idempotency keys; None for missing/NaN values"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _canonical_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+def idempotency_key(rule: str, record: Dict) -> Optional[str]:
+    """Key for the event a rule derives from one source record, or None
+    
+    Only records carrying one of IDENTITY_FIELDS get a key, so equal
+    values observed twice without an identity are never deduplicated. The
+    key hashes the whole canonicalized record (sorted keys, None/NaN
+    fields dropped, integral floats as ints), identity included: a replay
+    gets the same key, while different records sharing a capture
+    timestamp do not. A record and its row in records_to_columns give the
+    same key.
+    """
+    canonical = {}
+    for field, value in record.items():
+        value = _canonical_value(value)
+        if value is not None:
+            canonical[field] = value
+    if not any(field in canonical for field in IDENTITY_FIELDS):
+        return None
+    payload = json.dumps(canonical, sort_keys=True, separators=(',', ':'), default=_canonical_default)
+    return hashlib.blake2b(f"{rule}\0{payload}".encode(), digest_size=16).hexdigest()
+
+def event_stream(event_type: EventType) -> str:
+    """Redis stream key for one event type"""
+    return f"event_stream:{event_type.value}"
+
+def connect_redis(host: str = 'localhost', port: int = 6379, timeout: float = 1.0, max_connections: int = 8):
+    """redis.asyncio client over a bounded connection pool with socket timeouts"""
+    import redis.asyncio as aioredis
+    return aioredis.Redis(connection_pool=aioredis.ConnectionPool(
+        host=host, port=port, max_connections=max_connections, decode_responses=True,
+        socket_timeout=timeout, socket_connect_timeout=timeout
+    ))
+
+class P2Quantile:
+    """Streaming quantile estimate in constant memory (P² algorithm, Jain & Chlamtac)"""
+    
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self._heights = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+    
+    def add(self, x: float):
+        self.count += 1
+        q = self._heights
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+        
+        # Cell holding x, stretching the outer markers if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        
+        n = self._positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+        
+        # Move the middle markers toward their desired positions
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+    
+    @classmethod
+    def from_values(cls, p: float, values: np.ndarray) -> 'P2Quantile':
+        """Estimator in the state it would ideally reach after seeing values
+        
+        Markers sit at the order statistics nearest their desired positions,
+        which is where the streaming updates steer them.
+        """
+        estimator = cls(p)
+        n = len(values)
+        if n <= 5:
+            for value in values.tolist():
+                estimator.add(value)
+            return estimator
+        
+        desired = [1 + (n - 1) * increment for increment in estimator._increments]
+        positions = [1]
+        for i in (1, 2, 3):
+            positions.append(min(max(int(round(desired[i])), positions[-1] + 1), n - 4 + i))
+        positions.append(n)
+        ordered = np.sort(values)
+        
+        estimator.count = n
+        estimator._heights = [float(ordered[position - 1]) for position in positions]
+        estimator._positions = positions
+        estimator._desired = desired
+        return estimator
+    
+    def value(self) -> float:
+        if self.count == 0:
+            return 0.0
+        if self.count <= 5:
+            return float(np.percentile(self._heights, self.p * 100))
+        return self._heights[2]
+
+class RollingStats:
+    """Mean, population std and a quantile over the last window samples of one metric
+    
+    Mean and variance use Welford's update, reversed for samples leaving
+    the window. The quantile comes from two P² estimators restarted every
+    window samples, half a window apart; the older one, covering between
+    window/2 and window of the most recent samples, is reported.
+    """
+    
+    def __init__(self, window: int = 1000, quantile: float = 0.95):
+        self.window = window
+        self.quantile = quantile
+        self._values = deque()  # (sequence number, value)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._estimators = [None, None]
+    
+    def add(self, seq: int, value: float):
+        """Add the value observed for sample number seq"""
+        self._values.append((seq, value))
+        n = len(self._values)
+        delta = value - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (value - self._mean)
+        
+        while self._values[0][0] <= seq - self.window:
+            _, old = self._values.popleft()
+            n -= 1
+            delta = old - self._mean
+            self._mean -= delta / n
+            self._m2 -= delta * (old - self._mean)
+        
+        self._add_quantile(seq, value)
+    
+    def _add_quantile(self, seq: int, value: float):
+        for i, offset in enumerate((0, self.window // 2)):
+            if seq < offset:
+                continue
+            if (seq - offset) % self.window == 0 or self._estimators[i] is None:
+                self._estimators[i] = P2Quantile(self.quantile)
+            self._estimators[i].add(value)
+    
+    def extend(self, first_seq: int, values: np.ndarray):
+        """Add values observed for samples first_seq, first_seq + 1, ...
+        
+        Window statistics are recomputed from the window with NumPy and the
+        quantile estimators are re-seeded from the samples they cover, so
+        the cost per call is O(window) regardless of len(values).
+        """
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return
+        last_seq = first_seq + len(values) - 1
+        tail = values[-self.window:]
+        self._values.extend(zip(range(last_seq - len(tail) + 1, last_seq + 1), tail.tolist()))
+        while self._values[0][0] <= last_seq - self.window:
+            self._values.popleft()
+        
+        seqs = np.fromiter((seq for seq, _ in self._values), dtype=np.int64, count=len(self._values))
+        window = np.fromiter((value for _, value in self._values), dtype=float, count=len(self._values))
+        self._mean = float(window.mean())
+        self._m2 = float(np.square(window - self._mean).sum())
+        
+        for i, offset in enumerate((0, self.window // 2)):
+            if last_seq < offset:
+                continue
+            restarted = offset + (last_seq - offset) // self.window * self.window
+            self._estimators[i] = P2Quantile.from_values(self.quantile, window[seqs >= restarted])
+    
+    def window_values(self, size: int) -> np.ndarray:
+        """The most recent size values still in the window"""
+        count = min(size, len(self._values))
+        return np.fromiter((value for _, value in list(self._values)[len(self._values) - count:]),
+                           dtype=float, count=count)
+    
+    @property
+    def count(self) -> int:
+        return len(self._values)
+    
+    @property
+    def mean(self) -> float:
+        return self._mean
+    
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self._m2, 0.0) / len(self._values)) if self._values else 0.0
+    
+    @property
+    def percentile(self) -> float:
+        estimators = [e for e in self._estimators if e is not None]
+        return max(estimators, key=lambda e: e.count).value() if estimators else 0.0
+
+class _Rule:
+    """A registered detection rule with its profiling counters"""
+    __slots__ = ('func', 'event_type', 'requires', 'batch_func', 'order',
+                 'evaluations', 'batch_evaluations', 'events', 'total_time')
+    
+    def __init__(self, func: Callable, event_type: EventType, requires: Optional[frozenset],
+                 batch_func: Optional[Callable], order: int):
+        self.func = func
+        self.event_type = event_type
+        self.requires = requires
+        self.batch_func = batch_func
+        self.order = order
+        self.evaluations = 0
+        self.batch_evaluations = 0
+        self.events = 0
+        self.total_time = 0.0
+
+def _rule_name(rule: _Rule, event: Event) -> str:
+    """Name keying a rule's events: the rule metadata if set, else the rule function"""
+    return event.metadata.get('rule') or rule.func.__name__
 
 class EventDetector:
-    """Core event detection engine"""
+    """Core event detection engine
+    
+    Rules declaring the fields they need are only offered records that
+    contain all of them. The matching rules are worked out once per
+    distinct set of record fields and cached until a rule is added.
+    """
     
     def __init__(self):
         self.rules = []
+        self._dispatch = {}  # frozenset of record fields -> matching rules
+        self.dispatch_cache_size = 1024
         self.event_handlers = defaultdict(list)
         self.event_history = deque(maxlen=10000)
-        self.stats_window = deque(maxlen=1000)
         self.baseline_metrics = {}
         
+        # Rolling baseline over the last baseline_window samples
+        self.baseline_window = 1000
+        self.baseline_min_samples = 30
+        self._baseline_samples = 0
+        self._rolling_stats = {}
+        
         # Statistical thresholds
         self.z_score_threshold = 2.5
         self.frequency_window = 300  # 5 minutes
         
-    def add_rule(self, rule_func: Callable, event_type: EventType):
-        """Add detection rule"""
-        self.rules.append((rule_func, event_type))
+    def add_rule(self, rule_func: Callable, event_type: EventType, requires: Optional[List[str]] = None,
+                 batch_func: Optional[Callable] = None):
+        """Add detection rule
+        
+        requires lists the record fields the rule reads; the rule is only
+        called for records containing all of them. Rules without requires
+        are called for every record. batch_func(columns, detector) ->
+        List[Event] is an optional vectorized equivalent used by detect_batch.
+        """
+        rule = _Rule(rule_func, event_type, frozenset(requires) if requires is not None else None,
+                     batch_func, len(self.rules))
+        self.rules.append(rule)
+        self._dispatch.clear()
         logger.info(f"Added rule for {event_type.value}")
     
+    def _matching_rules(self, fields) -> List[_Rule]:
+        """Rules whose required fields are all present, in registration order"""
+        fields = frozenset(fields)
+        rules = self._dispatch.get(fields)
+        if rules is None:
+            # Records with ever-changing field sets would grow the cache without bound
+            if len(self._dispatch) >= self.dispatch_cache_size:
+                self._dispatch.clear()
+            rules = self._dispatch[fields] = [rule for rule in self.rules
+                                              if rule.requires is None or rule.requires <= fields]
+        return rules
+    
+    def rule_stats(self) -> List[Dict]:
+        """Per-rule evaluation counts and cumulative time, for profiling"""
+        return [{
+            'rule': rule.func.__name__,
+            'event_type': rule.event_type.value,
+            'requires': sorted(rule.requires) if rule.requires is not None else None,
+            'evaluations': rule.evaluations,
+            'batch_evaluations': rule.batch_evaluations,
+            'events': rule.events,
+            'total_time': rule.total_time,
+            'mean_time': rule.total_time / max(rule.evaluations + rule.batch_evaluations, 1)
+        } for rule in self.rules]
+    
     def add_handler(self, event_type: EventType, handler: Callable):
         """Add event handler"""
         self.event_handlers[event_type].append(handler)
@@ -89,13 +450,19 @@ class EventDetector:
         """Detect events from data stream"""
         detected_events = []
         
-        for rule_func, event_type in self.rules:
+        for rule in self._matching_rules(data_stream.keys()):
+            start = time.perf_counter()
             try:
-                event = rule_func(data_stream, self)
+                event = rule.func(data_stream, self)
                 if event:
+                    if event.idempotency_key is None:
+                        event.idempotency_key = idempotency_key(_rule_name(rule, event), data_stream)
                     detected_events.append(event)
+                    rule.events += 1
             except Exception as e:
-                logger.error(f"Error in rule {rule_func.__name__}: {e}")
+                logger.error(f"Error in rule {rule.func.__name__}: {e}")
+            rule.evaluations += 1
+            rule.total_time += time.perf_counter() - start
         
         # Store events in history
         self.event_history.extend(detected_events)
@@ -103,35 +470,573 @@ class EventDetector:
         return detected_events
     
     def update_baseline(self, metrics: Dict):
-        """Update baseline metrics for anomaly detection"""
-        self.stats_window.append(metrics)
-        
-        if len(self.stats_window) >= 30:  # Minimum sample size
-            for metric, value in metrics.items():
-                values = [m.get(metric, 0) for m in self.stats_window if metric in m]
-                if values:
-                    self.baseline_metrics[metric] = {
-                        'mean': np.mean(values),
-                        'std': np.std(values),
-                        'percentile_95': np.percentile(values, 95),
-                        'last_updated': datetime.now()
-                    }
+        """Update baseline metrics for anomaly detection
+        
+        Each sample costs O(1) per metric; see RollingStats.
+        """
+        self._baseline_samples += 1
+        seq = self._baseline_samples
+        for metric, value in metrics.items():
+            rolling = self._rolling_stats.get(metric)
+            if rolling is None:
+                rolling = self._rolling_stats[metric] = RollingStats(self.baseline_window, 0.95)
+            rolling.add(seq, float(value))
+        
+        if seq >= self.baseline_min_samples:  # Minimum sample size
+            self._refresh_baseline(metrics)
+    
+    def _refresh_baseline(self, metrics):
+        now = datetime.now()
+        for metric in metrics:
+            rolling = self._rolling_stats[metric]
+            self.baseline_metrics[metric] = {
+                'mean': rolling.mean,
+                'std': rolling.std,
+                'percentile_95': rolling.percentile,
+                'last_updated': now
+            }
+    
+    def detect_batch(self, columns: Dict[str, np.ndarray]) -> List[Event]:
+        """Detect events in a block of records given as equal-length columns
+        
+        Numeric columns use NaN for records missing the field. Rules with a
+        batch_func are evaluated as array expressions; any other rule is
+        called once per record that has its required fields, on a dict
+        rebuilt from the columns.
+        """
+        detected_events = []
+        rows = None
+        
+        for rule in self._matching_rules(columns.keys()):
+            start = time.perf_counter()
+            found = []
+            try:
+                if rule.batch_func is not None:
+                    found = rule.batch_func(columns, self)
+                    rule.batch_evaluations += 1
+                    # Batch functions key events by their source row (see column_row);
+                    # events they leave unkeyed are not deduplicated
+                else:
+                    if rows is None:
+                        rows = columns_to_records(columns)
+                    for row in rows:
+                        if rule.requires is None or rule.requires <= row.keys():
+                            rule.evaluations += 1
+                            event = rule.func(row, self)
+                            if event:
+                                if event.idempotency_key is None:
+                                    event.idempotency_key = idempotency_key(_rule_name(rule, event), row)
+                                found.append(event)
+            except Exception as e:
+                logger.error(f"Error in rule {rule.func.__name__}: {e}")
+            detected_events.extend(found)
+            rule.events += len(found)
+            rule.total_time += time.perf_counter() - start
+        
+        self.event_history.extend(detected_events)
+        return detected_events
+    
+    def baseline_arrays(self, metric: str, values: np.ndarray):
+        """Per-record (mean, std, ready) for a batch not yet added to the baseline
+        
+        Each record sees the baseline update_baseline would have produced
+        just after adding it: the trailing baseline_window values including
+        its own. ready is False until baseline_min_samples samples exist.
+        """
+        window = self.baseline_window
+        rolling = self._rolling_stats.get(metric)
+        prior = rolling.window_values(window - 1) if rolling is not None else np.empty(0)
+        combined = np.concatenate([prior, values.astype(float)])
+        
+        # Center the values so the running sums of squares keep their precision
+        shift = combined.mean() if len(combined) else 0.0
+        centered = combined - shift
+        sums = np.concatenate([[0.0], np.cumsum(centered)])
+        squares = np.concatenate([[0.0], np.cumsum(centered * centered)])
+        
+        end = np.arange(len(prior) + 1, len(combined) + 1)
+        start = np.maximum(end - window, 0)
+        count = end - start
+        mean = (sums[end] - sums[start]) / count
+        var = np.maximum((squares[end] - squares[start]) / count - mean * mean, 0.0)
+        
+        seq = self._baseline_samples + np.arange(1, len(values) + 1)
+        return mean + shift, np.sqrt(var), seq >= self.baseline_min_samples
+    
+    def update_baseline_batch(self, metrics: Dict[str, np.ndarray]):
+        """Add a block of samples to the baseline; equivalent to update_baseline per record"""
+        count = len(next(iter(metrics.values()))) if metrics else 0
+        if count == 0:
+            return
+        first_seq = self._baseline_samples + 1
+        for metric, values in metrics.items():
+            rolling = self._rolling_stats.get(metric)
+            if rolling is None:
+                rolling = self._rolling_stats[metric] = RollingStats(self.baseline_window, 0.95)
+            rolling.extend(first_seq, np.asarray(values, dtype=float))
+        self._baseline_samples += count
+        
+        if self._baseline_samples >= self.baseline_min_samples:
+            self._refresh_baseline(metrics)
 
-class RealTimeDataPipeline:
-    """Real-time data streaming and processing pipeline"""
+def column_row(columns: Dict[str, np.ndarray], index: int) -> Dict:
+    """One record rebuilt from columns, leaving out NaN/None fields"""
+    record = {}
+    for name, column in columns.items():
+        value = column[index]
+        if isinstance(value, np.generic):
+            value = value.item()
+        if value is not None and value == value:
+            record[name] = value
+    return record
+
+def columns_to_records(columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """Rebuild per-record dicts from columns, leaving out NaN/None fields"""
+    count = len(next(iter(columns.values()))) if columns else 0
+    records = [{} for _ in range(count)]
+    for name, column in columns.items():
+        for record, value in zip(records, column.tolist()):
+            if value is not None and value == value:
+                record[name] = value
+    return records
+
+def records_to_columns(records: List[Dict], fields: List[str]) -> Dict[str, np.ndarray]:
+    """Columns for a block of records; missing numeric fields become NaN
+    
+    Fields whose values are not all numbers are kept as object arrays.
+    """
+    columns = {}
+    for field in fields:
+        values = [record.get(field) for record in records]
+        try:
+            columns[field] = np.array([np.nan if v is None else v for v in values], dtype=float)
+        except (TypeError, ValueError):
+            columns[field] = np.array(values, dtype=object)
+    return columns
+
+class EventStore:
+    """SQLite event writer running on its own thread with group commits
+    
+    store() only enqueues. The writer thread owns one WAL-mode connection,
+    drains whatever is queued (up to batch_size events) into a single
+    transaction, so under load many events share one commit while an idle
+    store commits each event as soon as it arrives. flush() returns a
+    future for callers that need everything queued so far on disk. If a
+    batch fails to commit, on_failure (when given) is called from the
+    writer thread with the batch's idempotency keys. If the database
+    cannot be opened, the error is kept in self.error: queued and later
+    events are dropped and every flush() future fails with it.
+    """
+    
+    # Replays of an already stored event (same idempotency_key) are skipped
+    INSERT_SQL = """
+        INSERT OR IGNORE INTO events 
+        (event_id, event_type, severity, timestamp, source, data, metadata, idempotency_key)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    def __init__(self, db_path: str = 'event_detection.db', batch_size: int = 5000,
+                 on_failure: Optional[Callable[[List[str]], None]] = None):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.on_failure = on_failure
+        self.error = None
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()  # Orders queue puts against the writer giving up
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='event-store', daemon=True)
+        self._thread.start()
+    
+    def store(self, event: Event):
+        """Queue an event for the next group commit
+        
+        The row is serialized here so the writer thread spends its time in
+        SQLite, which runs without holding the GIL.
+        """
+        row = (
+            event.event_id,
+            event.event_type.value,
+            event.severity.value,
+            event.timestamp.isoformat(),
+            event.source,
+            json_codec.dumps(event.data),
+            json_codec.dumps(event.metadata),
+            event.idempotency_key
+        )
+        with self._lock:
+            if self.error is None:
+                self._queue.put(row)
+    
+    def flush(self) -> Future:
+        """Future resolved once every event queued before this call is committed"""
+        future = Future()
+        with self._lock:
+            if self.error is None:
+                self._queue.put(future)
+                return future
+        future.set_exception(self.error)
+        return future
+    
+    def close(self, timeout: Optional[float] = None):
+        """Commit everything queued and stop the writer thread"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join(timeout)
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Stream workers in other processes may share the file; wait out their commits
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                event_id TEXT PRIMARY KEY,
+                event_type TEXT,
+                severity TEXT,
+                timestamp TEXT,
+                source TEXT,
+                data TEXT,
+                metadata TEXT,
+                idempotency_key TEXT
+            )
+        """)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+        if 'idempotency_key' not in columns:
+            conn.execute("ALTER TABLE events ADD COLUMN idempotency_key TEXT")
+        # Rows from before the column existed are NULL, which a unique index allows
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_events_idempotency_key ON events(idempotency_key)")
+        conn.commit()
+        return conn
+    
+    def _fail(self, error: Exception):
+        """Give up on the database: drop queued events and fail every waiter, now and later"""
+        with self._lock:
+            self.error = error
+        dropped = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, Future):
+                if item.set_running_or_notify_cancel():
+                    item.set_exception(error)
+            elif item is not None:
+                dropped += 1
+        logger.error(f"Event store {self.db_path} unavailable, dropped {dropped} events: {error}")
+    
+    def _run(self):
+        try:
+            conn = self._connect()
+        except Exception as e:
+            self._fail(e)
+            return
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            rows = [item for item in batch if isinstance(item, tuple)]
+            waiters = [item for item in batch if isinstance(item, Future)]
+            stopping = None in batch
+            error = None
+            try:
+                if rows:
+                    with conn:
+                        conn.executemany(self.INSERT_SQL, rows)
+            except Exception as e:
+                logger.error(f"Event store error, dropped {len(rows)} events: {e}")
+                error = e
+                if self.on_failure is not None:
+                    # Let retries of the dropped events through deduplication
+                    self.on_failure([row[-1] for row in rows if row[-1] is not None])
+            
+            for waiter in waiters:
+                # Waiters may have given up (cancelled) in the meantime
+                if waiter.set_running_or_notify_cancel():
+                    if error is None:
+                        waiter.set_result(None)
+                    else:
+                        waiter.set_exception(error)
+        conn.close()
+
+class RecentKeys:
+    """Bounded LRU set of recently seen idempotency keys
+    
+    Thread-safe: the EventStore writer thread discards the keys of
+    batches that failed to commit.
+    """
+    
+    def __init__(self, capacity: int = 100000):
+        self.capacity = capacity
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def add(self, key: str) -> bool:
+        """Remember key; False if it was already present"""
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+                return False
+            self._keys[key] = None
+            if len(self._keys) > self.capacity:
+                self._keys.popitem(last=False)
+            return True
+    
+    def discard(self, keys: List[str]):
+        """Forget keys, so events carrying them are accepted again"""
+        with self._lock:
+            for key in keys:
+                self._keys.pop(key, None)
+
+class RedisEventSink:
+    """Event cache and stream writes to Redis, batched into pipelined round trips
+    
+    publish() only appends to a local buffer. A background task on the
+    running loop sends up to batch_size events per round trip: one SETEX
+    and one XADD per event, with each event_stream:<type> stream capped
+    near stream_length entries (MAXLEN ~). While Redis is
+    unreachable, events stay buffered (oldest dropped beyond buffer_limit)
+    and are retried every retry_interval seconds. client may be any
+    redis.asyncio-compatible object, e.g. an in-process stand-in.
+    """
     
-    def __init__(self, redis_host='localhost', redis_port=6379):
-        self.redis_client = None
+    def __init__(self, host: str = 'localhost', port: int = 6379, client=None,
+                 batch_size: int = 500, flush_interval: float = 0.05, buffer_limit: int = 10000,
+                 timeout: float = 1.0, retry_interval: float = 5.0,
+                 ttl: int = 3600, stream_length: int = 100000):
+        self.client = client if client is not None else connect_redis(host, port, timeout)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer_limit = buffer_limit
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.ttl = ttl
+        self.stream_length = stream_length
+        
+        self.available = True
+        self.dropped = 0
+        self._buffer = deque()  # (event_id, stream key, payload)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._closing = False
+    
+    def __len__(self) -> int:
+        return len(self._buffer)
+    
+    def publish(self, event: Event):
+        """Buffer an event for the next pipelined write"""
+        self._buffer.append((event.event_id, event_stream(event.event_type),
+                             json_codec.dumps(event.to_dict())))
+        self._trim()
+        self._wakeup.set()
+        if self._task is None:
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                pass  # No loop yet; the first publish from inside one starts the writer
+    
+    def _trim(self):
+        while len(self._buffer) > self.buffer_limit:
+            self._buffer.popleft()
+            self.dropped += 1
+    
+    async def _run(self):
+        while self._buffer or not self._closing:
+            if not self._buffer:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if len(self._buffer) < self.batch_size and not self._closing:
+                await asyncio.sleep(self.flush_interval)  # Let a batch accumulate
+            if not await self.send_batch():
+                if self._closing:
+                    break
+                await asyncio.sleep(self.retry_interval)
+    
+    async def send_batch(self) -> bool:
+        """Write up to batch_size buffered events in one round trip; False if Redis failed"""
+        batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+        if not batch:
+            return True
+        
+        pipe = self.client.pipeline(transaction=False)
+        for event_id, stream, payload in batch:
+            pipe.setex(f"event:{event_id}", self.ttl, payload)
+            # Approximate trimming lets Redis drop whole macro nodes, which is far cheaper
+            pipe.xadd(stream, {'event': payload}, maxlen=self.stream_length, approximate=True)
+        
         try:
-            import redis
-            self.redis_client = redis.Redis(host=redis_host, port=redis_port, decode_responses=True)
-            logger.info("Redis connection established")
+            await asyncio.wait_for(pipe.execute(), self.timeout)
         except Exception as e:
-            logger.warning(f"Redis not available: {e}")
+            # Put the batch back in order; the oldest events go first if over the limit
+            self._buffer.extendleft(reversed(batch))
+            self._trim()
+            if self.available:
+                logger.warning(f"Redis unavailable, buffering events locally: {e}")
+            self.available = False
+            return False
+        
+        if not self.available:
+            logger.info(f"Redis available again, {len(self._buffer)} buffered events pending")
+            self.available = True
+        return True
+    
+    async def flush(self):
+        """Send everything buffered now, stopping at the first failure"""
+        while self._buffer:
+            if not await self.send_batch():
+                break
+    
+    async def close(self):
+        """Send what can be sent and close the client"""
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, self.timeout * 2)
+            except asyncio.TimeoutError:
+                pass
+        if self._buffer:
+            logger.warning(f"Discarding {len(self._buffer)} events not written to Redis")
+        close = getattr(self.client, 'aclose', None) or getattr(self.client, 'close', None)
+        if close is not None:
+            result = close()
+            if asyncio.iscoroutine(result):
+                await result
+
+class EventStreamWorker:
+    """Consumer-group reader for the event streams
+    
+    Every worker joins the same group under its own consumer name, so Redis
+    hands each stream entry to exactly one of them and N processes split
+    the downstream work. Entries are acknowledged only after handler()
+    returns. Entries a crashed or stuck consumer left pending for longer
+    than claim_idle_ms are taken over with XAUTOCLAIM and handled again,
+    so handlers must tolerate seeing an event twice.
+    """
+    
+    def __init__(self, client, handler: Callable, group: str = 'event-workers', consumer: Optional[str] = None,
+                 streams: Optional[List[str]] = None, batch_size: int = 200, block_ms: int = 1000,
+                 claim_idle_ms: int = 60000, claim_interval: float = 30.0):
+        self.client = client
+        self.handler = handler  # async handler(List[Event])
+        self.group = group
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.streams = list(streams or (event_stream(event_type) for event_type in EventType))
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.claim_interval = claim_interval
+        
+        self.processed = 0
+        self.claimed = 0
+        self.failed = 0
+        self._running = False
+    
+    async def ensure_groups(self):
+        """Create the group on every stream (and the stream itself) if missing"""
+        for stream in self.streams:
+            try:
+                await self.client.xgroup_create(stream, self.group, id='0', mkstream=True)
+            except Exception as e:
+                if 'BUSYGROUP' not in str(e):
+                    raise
+    
+    async def run(self):
+        """Handle entries until stop() is called"""
+        await self.ensure_groups()
+        logger.info(f"Stream worker {self.consumer} reading {len(self.streams)} streams as group {self.group}")
+        self._running = True
+        last_claim = 0.0
+        while self._running:
+            try:
+                if time.monotonic() - last_claim >= self.claim_interval:
+                    last_claim = time.monotonic()
+                    await self.claim_stale()
+                
+                entries = await self.client.xreadgroup(self.group, self.consumer,
+                                                       {stream: '>' for stream in self.streams},
+                                                       count=self.batch_size, block=self.block_ms)
+                for stream, messages in entries or []:
+                    await self._handle(stream, messages)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Stream worker {self.consumer} error: {e}")
+                await asyncio.sleep(1.0)
+    
+    def stop(self):
+        self._running = False
+    
+    async def claim_stale(self):
+        """Take over and handle entries left pending by other consumers"""
+        for stream in self.streams:
+            start = '0-0'
+            while True:
+                reply = await self.client.xautoclaim(stream, self.group, self.consumer, self.claim_idle_ms,
+                                                     start_id=start, count=self.batch_size)
+                start, messages = reply[0], reply[1]
+                if messages:
+                    self.claimed += len(messages)
+                    logger.info(f"Stream worker {self.consumer} claimed {len(messages)} stale entries from {stream}")
+                    await self._handle(stream, messages)
+                if start == '0-0':
+                    break
+    
+    async def _handle(self, stream: str, messages: List):
+        events = []
+        ids = []
+        for message_id, fields in messages:
+            ids.append(message_id)
+            if not fields:
+                continue  # Trimmed from the stream while pending
+            try:
+                events.append(Event.from_dict(json_codec.loads(fields['event'])))
+            except (KeyError, TypeError, *json_codec.DecodeError) as e:
+                logger.warning(f"Dropping malformed entry {message_id} from {stream}: {e}")
+        
+        if events:
+            try:
+                await self.handler(events)
+            except Exception as e:
+                # Left unacknowledged, so claim_stale retries them after claim_idle_ms
+                self.failed += len(events)
+                logger.error(f"Stream worker {self.consumer} failed {len(events)} events from {stream}: {e}")
+                return
+        
+        await self.client.xack(stream, self.group, *ids)
+        self.processed += len(events)
+
+class RealTimeDataPipeline:
+    """Real-time data streaming and processing pipeline"""
+    
+    def __init__(self, redis_host: Optional[str] = 'localhost', redis_port=6379, redis_client=None,
+                 db_path: Optional[str] = 'event_detection.db'):
+        # redis_host=None (without a client) and db_path=None give a detection-only pipeline
+        self.redis_sink = None
+        if redis_host is not None or redis_client is not None:
+            try:
+                self.redis_sink = RedisEventSink(redis_host, redis_port, client=redis_client)
+                logger.info(f"Redis event sink configured for {redis_host}:{redis_port}")
+            except Exception as e:
+                logger.warning(f"Redis not available: {e}")
             
         self.websocket_clients = set()
         self.data_streams = {}
         self.event_detector = EventDetector()
+        # db_path=None leaves SQLite storage to EventStreamWorker processes
+        self.recent_keys = RecentKeys()
+        self.event_store = EventStore(db_path, on_failure=self.recent_keys.discard) if db_path else None
+        self.duplicates = 0
         
         # Setup detection rules
         self._setup_detection_rules()
@@ -211,14 +1116,84 @@ class RealTimeDataPipeline:
                     )
             return None
         
+        # Vectorized equivalents used by detect_batch
+        def odds_change_batch(columns: Dict[str, np.ndarray], detector: EventDetector) -> List[Event]:
+            if 'odds' not in columns or 'previous_odds' not in columns:
+                return []
+            odds = columns['odds']
+            previous = columns['previous_odds']
+            with np.errstate(divide='ignore', invalid='ignore'):
+                change_pct = np.where(previous > 0, np.abs(odds - previous) / previous, 0.0)
+            hits = np.flatnonzero(~np.isnan(odds) & ~np.isnan(previous) & (change_pct > 0.1))
+            
+            match_ids = columns.get('match_id')
+            now = datetime.now()
+            return [Event(
+                event_id=self._generate_event_id(),
+                event_type=EventType.ODDS_CHANGE,
+                severity=Severity.HIGH if change_pct[i] > 0.25 else Severity.MEDIUM,
+                timestamp=now,
+                source='odds_monitor',
+                data={
+                    'match_id': match_ids[i] if match_ids is not None else None,
+                    'old_odds': float(previous[i]),
+                    'new_odds': float(odds[i]),
+                    'change_percent': float(change_pct[i]) * 100
+                },
+                metadata={'rule': 'odds_change_detection'},
+                idempotency_key=idempotency_key('odds_change_detection', column_row(columns, i))
+            ) for i in hits.tolist()]
+        
+        def api_spike_batch(columns: Dict[str, np.ndarray], detector: EventDetector) -> List[Event]:
+            if 'api_calls_per_minute' not in columns:
+                return []
+            rates = columns['api_calls_per_minute']
+            # The baseline counts records without the field as 0, like process_data_stream
+            mean, std, ready = detector.baseline_arrays('api_calls_per_minute', np.nan_to_num(rates))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z_scores = np.where(std > 0, (rates - mean) / std, 0.0)
+            hits = np.flatnonzero(ready & ~np.isnan(rates) & (np.abs(z_scores) > detector.z_score_threshold))
+            
+            now = datetime.now()
+            return [Event(
+                event_id=self._generate_event_id(),
+                event_type=EventType.API_SPIKE,
+                severity=Severity.HIGH if abs(z_scores[i]) > 3 else Severity.MEDIUM,
+                timestamp=now,
+                source='api_monitor',
+                data={
+                    'current_rate': float(rates[i]),
+                    'baseline_mean': float(mean[i]),
+                    'z_score': float(z_scores[i])
+                },
+                metadata={'rule': 'api_spike_detection'},
+                idempotency_key=idempotency_key('api_spike_detection', column_row(columns, i))
+            ) for i in hits.tolist()]
+        
+        def competitor_activity_batch(columns: Dict[str, np.ndarray], detector: EventDetector) -> List[Event]:
+            # Domain maps cannot be vectorized; only the one column is visited
+            domains = columns.get('competitor_domains')
+            if domains is None:
+                return []
+            events = []
+            for i, value in enumerate(domains.tolist()):
+                event = competitor_activity_rule({'competitor_domains': value}, detector) if value is not None else None
+                if event:
+                    event.idempotency_key = idempotency_key('competitor_activity_detection', column_row(columns, i))
+                    events.append(event)
+            return events
+        
         # Add rules to detector
-        self.event_detector.add_rule(odds_change_rule, EventType.ODDS_CHANGE)
-        self.event_detector.add_rule(api_spike_rule, EventType.API_SPIKE)
-        self.event_detector.add_rule(competitor_activity_rule, EventType.COMPETITOR_ACTIVITY)
+        self.event_detector.add_rule(odds_change_rule, EventType.ODDS_CHANGE,
+                                     requires=['odds', 'previous_odds'], batch_func=odds_change_batch)
+        self.event_detector.add_rule(api_spike_rule, EventType.API_SPIKE,
+                                     requires=['api_calls_per_minute'], batch_func=api_spike_batch)
+        self.event_detector.add_rule(competitor_activity_rule, EventType.COMPETITOR_ACTIVITY,
+                                     requires=['competitor_domains'], batch_func=competitor_activity_batch)
     
     def _generate_event_id(self) -> str:
-        """Generate unique event ID"""
-        return hashlib.md5(f"{datetime.now().isoformat()}{time.time()}".encode()).hexdigest()[:12]
+        """Generate unique event ID (see EventIdGenerator)"""
+        return generate_event_id()
     
     async def start_websocket_server(self, port: int = 9001):
         """Start WebSocket server for real-time streaming"""
@@ -238,7 +1213,7 @@ class RealTimeDataPipeline:
     async def broadcast_event(self, event: Event):
         """Broadcast event to all connected WebSocket clients"""
         if self.websocket_clients:
-            message = json.dumps(event.to_dict())
+            message = json_codec.dumps(event.to_dict())
             disconnected = set()
             
             for client in self.websocket_clients.copy():
@@ -253,63 +1228,49 @@ class RealTimeDataPipeline:
             # Remove disconnected clients
             self.websocket_clients -= disconnected
     
-    def store_event(self, event: Event):
-        """Store event in database and cache"""
-        # SQLite storage
-        conn = sqlite3.connect('event_detection.db')
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS events (
-                event_id TEXT PRIMARY KEY,
-                event_type TEXT,
-                severity TEXT,
-                timestamp TEXT,
-                source TEXT,
-                data TEXT,
-                metadata TEXT
-            )
-        """)
+    def store_event(self, event: Event) -> bool:
+        """Store event in database and cache; False if it was a recent duplicate"""
+        return bool(self.store_events([event]))
+    
+    def store_events(self, events: List[Event]) -> List[Event]:
+        """Queue events for the SQLite writer thread and write them to the cache
         
-        cursor.execute("""
-            INSERT OR REPLACE INTO events 
-            (event_id, event_type, severity, timestamp, source, data, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            event.event_id,
-            event.event_type.value,
-            event.severity.value,
-            event.timestamp.isoformat(),
-            event.source,
-            json.dumps(event.data),
-            json.dumps(event.metadata)
-        ))
+        Events whose idempotency_key was seen recently are dropped here, so
+        replayed records are neither stored, published nor broadcast again;
+        the returned list holds the ones that were kept. Events without a
+        key (records with no identity, see idempotency_key) are always kept. Nothing here waits
+        on disk; see flush_events.
+        """
+        fresh = [event for event in events
+                 if event.idempotency_key is None or self.recent_keys.add(event.idempotency_key)]
+        self.duplicates += len(events) - len(fresh)
+        events = fresh
         
-        conn.commit()
-        conn.close()
+        # SQLite storage (group-committed by the writer thread)
+        if self.event_store is not None:
+            for event in events:
+                self.event_store.store(event)
         
-        # Redis cache (if available)
-        if self.redis_client:
-            try:
-                self.redis_client.setex(
-                    f"event:{event.event_id}",
-                    3600,  # 1 hour expiry
-                    json.dumps(event.to_dict())
-                )
-                
-                # Add to event stream
-                self.redis_client.lpush(
-                    f"event_stream:{event.event_type.value}",
-                    json.dumps(event.to_dict())
-                )
-                self.redis_client.ltrim(f"event_stream:{event.event_type.value}", 0, 999)  # Keep last 1000
-                
-            except Exception as e:
-                logger.error(f"Redis storage error: {e}")
+        # Redis cache and streams (pipelined in the background)
+        if self.redis_sink is not None:
+            for event in events:
+                self.redis_sink.publish(event)
+        return events
     
-    async def process_data_stream(self, data: Dict):
-        """Process incoming data stream and detect events"""
-        # Update baseline metrics
+    async def flush_events(self):
+        """Wait until every event stored so far is committed to SQLite"""
+        if self.event_store is not None:
+            await asyncio.wrap_future(self.event_store.flush())
+    
+    async def close(self):
+        """Commit pending events, drain the Redis buffer and stop the writers"""
+        if self.redis_sink is not None:
+            await self.redis_sink.close()
+        if self.event_store is not None:
+            self.event_store.close()
+    
+    def detect(self, data: Dict) -> List[Event]:
+        """Update the baselines with one record and run the rules on it"""
         metrics = {
             'api_calls_per_minute': data.get('api_calls_per_minute', 0),
             'betting_events': data.get('betting_events', 0),
@@ -318,22 +1279,219 @@ class RealTimeDataPipeline:
         }
         
         self.event_detector.update_baseline(metrics)
+        return self.event_detector.detect_events(data)
+    
+    async def process_data_stream(self, data: Dict, durable: bool = False):
+        """Process incoming data stream and detect events"""
+        events = self.detect(data)
         
-        # Detect events
-        events = self.event_detector.detect_events(data)
-        
-        # Process each detected event
+        # Process each detected event, skipping replays
+        events = self.store_events(events)
         for event in events:
-            # Store event
-            self.store_event(event)
-            
             # Broadcast to clients
             await self.broadcast_event(event)
             
             # Log event
             logger.info(f"Event detected: {event.event_type.value} ({event.severity.value})")
+        
+        # Only wait for the commit when the caller needs the events on disk
+        if durable and events:
+            await self.flush_events()
             
         return events
+    
+    async def process_batch(self, columns: Dict[str, np.ndarray], durable: bool = False) -> List[Event]:
+        """Process a block of records given as NumPy columns (see records_to_columns)
+        
+        Detects the same events as calling process_data_stream on each record
+        in order, with the built-in rules evaluated as array expressions.
+        Events are queued for storage and broadcast; with durable=True this
+        returns only after they are committed.
+        """
+        count = len(next(iter(columns.values()))) if columns else 0
+        if count == 0:
+            return []
+        
+        events = self.event_detector.detect_batch(columns)
+        self.event_detector.update_baseline_batch({
+            metric: np.nan_to_num(columns[metric]) if metric in columns else np.zeros(count)
+            for metric in ('api_calls_per_minute', 'betting_events', 'unique_users', 'data_volume')
+        })
+        
+        events = self.store_events(events)
+        for event in events:
+            await self.broadcast_event(event)
+        if durable and events:
+            await self.flush_events()
+        
+        if events:
+            logger.info(f"Batch of {count} records: {len(events)} events detected")
+        return events
+
+def jump_hash(key: int, buckets: int) -> int:
+    """Jump consistent hash (Lamping & Veach)
+    
+    Growing from N to N+1 buckets moves only 1/(N+1) of the keys, all of
+    them to the new bucket.
+    """
+    bucket, j = -1, 0
+    while j < buckets:
+        bucket = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((bucket + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return bucket
+
+def shard_for(match_id, shards: int) -> int:
+    """Shard owning a match; records without a match_id all go to one shard"""
+    key = zlib.crc32(str(match_id if match_id is not None else '').encode())
+    return jump_hash(key, shards)
+
+def _shard_worker(shard: int, inbox, outbox):
+    """Worker process entry point: detection for the matches routed to one shard"""
+    pipeline = RealTimeDataPipeline(redis_host=None, db_path=None)
+    while True:
+        chunk = inbox.get()
+        if chunk is None:
+            break
+        events = []
+        for data in chunk:
+            try:
+                events.extend(pipeline.detect(data))
+            except Exception as e:
+                logger.error(f"Shard {shard} failed on record for {data.get('match_id')}: {e}")
+        outbox.put((shard, events))
+    outbox.put((shard, None))
+
+class ShardedDetector:
+    """Runs detect() in worker processes, one shard of matches per process
+    
+    Records are routed by a consistent hash of match_id, so each match is
+    always handled by the same worker with its own EventDetector. Records
+    travel in per-shard chunks over FIFO queues and every worker handles
+    its chunks in order, which keeps each match's records and events in
+    submission order; events of different shards may interleave. Detected
+    events come back to this process and go through the pipeline's
+    store_events and broadcast_event.
+    
+    Baselines are per shard: api_spike compares a record with the traffic
+    of its own shard rather than of all matches.
+    """
+    
+    def __init__(self, pipeline: RealTimeDataPipeline, shards: Optional[int] = None,
+                 chunk_size: int = 256, flush_interval: float = 0.01, max_pending: int = 64):
+        self.pipeline = pipeline
+        self.shards = shards or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending  # Chunks in flight before submit() waits
+        
+        self.records = 0
+        self.events = 0
+        self._buffers = [[] for _ in range(self.shards)]
+        self._inboxes = []
+        self._results = None
+        self._processes = []
+        self._slots = None
+        self._sent = 0
+        self._received = 0
+        self._done = None
+        self._tasks = []
+    
+    def start(self):
+        """Start the worker processes; call from the running event loop"""
+        # Spawned, not forked: this process already runs writer threads
+        context = multiprocessing.get_context('spawn')
+        self._results = context.Queue()
+        for shard in range(self.shards):
+            inbox = context.Queue()
+            process = context.Process(target=_shard_worker, args=(shard, inbox, self._results),
+                                      name=f"event-shard-{shard}", daemon=True)
+            process.start()
+            self._inboxes.append(inbox)
+            self._processes.append(process)
+        
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._done = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._collect()), asyncio.create_task(self._tick())]
+        logger.info(f"Started {self.shards} detection shards")
+    
+    async def submit(self, data: Dict):
+        """Route one record to its shard; waits only when too many chunks are in flight"""
+        shard = shard_for(data.get('match_id'), self.shards)
+        buffer = self._buffers[shard]
+        buffer.append(data)
+        self.records += 1
+        if len(buffer) >= self.chunk_size:
+            await self._send(shard)
+    
+    async def _send(self, shard: int):
+        chunk = self._buffers[shard]
+        if not chunk:
+            return
+        self._buffers[shard] = []
+        await self._slots.acquire()
+        self._inboxes[shard].put(chunk)
+        self._sent += 1
+    
+    async def _tick(self):
+        # Partial chunks go out after flush_interval, so slow streams are not held back
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            for shard in range(self.shards):
+                await self._send(shard)
+    
+    def _next_result(self):
+        while True:
+            try:
+                return self._results.get(timeout=1.0)
+            except queue.Empty:
+                dead = [p.name for p in self._processes if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Detection shards exited: {', '.join(dead)}")
+    
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        running = self.shards
+        try:
+            while running:
+                shard, events = await loop.run_in_executor(None, self._next_result)
+                if events is None:
+                    running -= 1
+                    continue
+                
+                events = self.pipeline.store_events(events)
+                for event in events:
+                    await self.pipeline.broadcast_event(event)
+                self.events += len(events)
+                
+                self._slots.release()
+                async with self._done:
+                    self._received += 1
+                    self._done.notify_all()
+        finally:
+            # Wake flush() if the collector stops early
+            async with self._done:
+                self._done.notify_all()
+    
+    async def flush(self):
+        """Send partial chunks and wait until every submitted record is processed"""
+        for shard in range(self.shards):
+            await self._send(shard)
+        async with self._done:
+            await self._done.wait_for(lambda: self._received >= self._sent or self._tasks[0].done())
+        if self._tasks[0].done() and self._tasks[0].exception():
+            raise self._tasks[0].exception()
+    
+    async def close(self):
+        """Process everything submitted, then stop the workers"""
+        await self.flush()
+        self._tasks[1].cancel()
+        for inbox in self._inboxes:
+            inbox.put(None)
+        await self._tasks[0]
+        for process in self._processes:
+            process.join(timeout=5)
+        logger.info(f"Detection shards stopped: {self.records} records, {self.events} events")
 
 class CompetitiveIntelligenceEngine:
     """Advanced competitive intelligence gathering and analysis"""
@@ -447,12 +1605,49 @@ class CompetitiveIntelligenceEngine:
             }
         ]
 
-async def main():
+async def run_stream_worker(args):
+    """Consumer-group worker: store and report events read from the Redis streams"""
+    store = EventStore(args.db)
+    counts = defaultdict(int)
+    
+    async def handle(events: List[Event]):
+        for event in events:
+            store.store(event)
+        # Acknowledge only what is on disk
+        await asyncio.wrap_future(store.flush())
+        for event in events:
+            counts[event.event_type.value] += 1
+    
+    client = connect_redis(args.redis_host, args.redis_port, timeout=5.0)
+    worker = EventStreamWorker(client, handle, group=args.group, consumer=args.consumer)
+    
+    async def report():
+        while True:
+            await asyncio.sleep(60)
+            logger.info(f"Stream worker {worker.consumer}: {worker.processed} processed, "
+                        f"{worker.claimed} claimed, {worker.failed} failed, by type {dict(counts)}")
+    
+    report_task = asyncio.create_task(report())
+    try:
+        await worker.run()
+    finally:
+        report_task.cancel()
+        store.close()
+        await client.aclose()
+
+async def main(args):
     """Main execution function"""
     logger.info("Starting Advanced Event Detection System")
     
     # Initialize pipeline
-    pipeline = RealTimeDataPipeline()
+    pipeline = RealTimeDataPipeline(args.redis_host, args.redis_port,
+                                    db_path=None if args.stream_storage else args.db)
+    
+    # Optional multi-process detection, sharded by match_id
+    sharded = None
+    if args.shards > 1:
+        sharded = ShardedDetector(pipeline, args.shards)
+        sharded.start()
     
     # Initialize competitive intelligence
     intel_engine = CompetitiveIntelligenceEngine(pipeline)
@@ -466,6 +1661,7 @@ async def main():
             try:
                 # Simulate incoming data
                 sample_data = {
+                    'timestamp': datetime.now().isoformat(),
                     'api_calls_per_minute': np.random.poisson(25),
                     'betting_events': np.random.poisson(15),
                     'unique_users': np.random.poisson(100),
@@ -481,7 +1677,11 @@ async def main():
                 }
                 
                 # Process data stream
-                events = await pipeline.process_data_stream(sample_data)
+                if sharded:
+                    await sharded.submit(sample_data)
+                    events = []  # Stored and broadcast when the shard returns them
+                else:
+                    events = await pipeline.process_data_stream(sample_data)
                 
                 if events:
                     logger.info(f"Processed {len(events)} events")
@@ -503,7 +1703,24 @@ async def main():
     except Exception as e:
         logger.error(f"System error: {e}")
     finally:
+        if sharded:
+            await sharded.close()
+        await pipeline.close()
         logger.info("Advanced Event Detection System stopped")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--worker', action='store_true', help='Run as an event stream consumer-group worker')
+    parser.add_argument('--redis-host', default='localhost')
+    parser.add_argument('--redis-port', type=int, default=6379)
+    parser.add_argument('--db', default='event_detection.db', help='Event database path')
+    parser.add_argument('--stream-storage', action='store_true',
+                        help='Leave SQLite storage to --worker processes instead of the pipeline')
+    parser.add_argument('--group', default='event-workers', help='Consumer group name')
+    parser.add_argument('--consumer', default=None, help='Consumer name (default: host-pid)')
+    parser.add_argument('--shards', type=int, default=1, help='Detection worker processes, sharded by match_id')
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args()
+    asyncio.run(run_stream_worker(args) if args.worker else main(args))
\ No newline at end of file
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""
+Phase 2: JSON Codec Layer
+Picks the fastest installed JSON decoder/encoder (orjson, msgspec) with a stdlib fallback
+"""
+
+import json
+import logging
+import os
+from enum import Enum
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Set JSON_CODEC=stdlib|orjson|msgspec to force a backend
+PREFERRED = os.environ.get('JSON_CODEC', '').lower()
+
+DecodeError = (ValueError,)
+
+def _stdlib_dumps(obj: Any, default: Callable = str) -> str:
+    return json.dumps(obj, default=default)
+
+DECODERS: Dict[str, Callable] = {'stdlib': json.loads}
+ENCODERS: Dict[str, Callable] = {'stdlib': _stdlib_dumps}
+
+try:
+    import orjson
+
+    # Datetimes and dataclasses go through default like they do with the
+    # stdlib, instead of orjson's native RFC 3339 / dict serialization
+    _ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME
+                       | orjson.OPT_PASSTHROUGH_DATACLASS
+                       | orjson.OPT_NON_STR_KEYS)
+
+    # orjson writes NaN/Infinity as null; they are swapped for marker strings
+    # and restored to the stdlib's bare NaN/Infinity tokens after encoding
+    _MARK = '\ue000'
+    _NON_FINITE = {'nan': 'NaN', 'inf': 'Infinity', '-inf': '-Infinity'}
+
+    def _orjson_prepare(obj: Any, default: Callable) -> Any:
+        """obj with the values orjson would encode differently from the stdlib replaced
+
+        Non-finite floats become marker strings and plain Enum members go
+        through default (orjson encodes them by value). Unchanged
+        containers are returned as-is, so the common case allocates nothing.
+        """
+        kind = type(obj)
+        if kind is str or kind is int or kind is bool or obj is None:
+            return obj
+        if isinstance(obj, float):
+            if obj - obj == 0:
+                return obj
+            return f"{_MARK}{_NON_FINITE[repr(float(obj))]}{_MARK}"
+        if isinstance(obj, dict):
+            changed = None
+            for key, value in obj.items():
+                new = _orjson_prepare(value, default)
+                if new is not value:
+                    if changed is None:
+                        changed = dict(obj)
+                    changed[key] = new
+            return obj if changed is None else changed
+        if isinstance(obj, (list, tuple)):
+            items = [_orjson_prepare(value, default) for value in obj]
+            return obj if all(new is old for new, old in zip(items, obj)) else items
+        if isinstance(obj, Enum) and not isinstance(obj, (str, int, float)):
+            return _orjson_prepare(default(obj), default)
+        return obj
+
+    def _orjson_dumps(obj: Any, default: Callable = str) -> str:
+        def fallback(o):
+            # numpy scalars subclassing float/int are plain numbers to the stdlib
+            if isinstance(o, float):
+                return _orjson_prepare(float(o), default)
+            if isinstance(o, int):
+                return int(o)
+            return _orjson_prepare(default(o), default)
+        out = orjson.dumps(_orjson_prepare(obj, default), default=fallback, option=_ORJSON_OPTIONS).decode()
+        if _MARK in out:
+            for token in _NON_FINITE.values():
+                out = out.replace(f'"{_MARK}{token}{_MARK}"', token)
+        return out
+
+    DECODERS['orjson'] = orjson.loads
+    ENCODERS['orjson'] = _orjson_dumps
+except ImportError:
+    pass
+
+try:
+    import msgspec
+
+    # msgspec encodes datetimes natively, so it is only used for decoding
+    DECODERS['msgspec'] = msgspec.json.decode
+    DecodeError = DecodeError + (msgspec.DecodeError,)
+except ImportError:
+    pass
+
+def _select(backends: Dict[str, Callable], order) -> str:
+    if PREFERRED in backends:
+        return PREFERRED
+    return next(name for name in order if name in backends)
+
+DECODER = _select(DECODERS, ('msgspec', 'orjson', 'stdlib'))
+ENCODER = _select(ENCODERS, ('orjson', 'stdlib'))
+
+loads = DECODERS[DECODER]
+_dumps = ENCODERS[ENCODER]
+
+def dumps(obj: Any, default: Callable = str) -> str:
+    """Serialize obj to a JSON string, passing unsupported types through default
+
+    Output matches json.dumps(obj, default=default) up to whitespace.
+    """
+    return _dumps(obj, default)
+
+logger.debug(f"JSON codec: decoder={DECODER}, encoder={ENCODER}")
@@ -5,14 +5,13 @@ Phase 2: Machine Learning Pattern Analysis Engine
 Advanced betting odds analysis, user behavior detection, and competitive intelligence
 """
 
-import json
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import re
 import sqlite3
-from collections import defaultdict, deque
-from typing import Dict, List, Tuple, Optional
+from collections import Counter, OrderedDict, defaultdict, deque
+from typing import Callable, Dict, List, Tuple, Optional
 import asyncio
 import websockets
 import logging
@@ -20,6 +19,15 @@ from dataclasses import dataclass
 import pickle
 import os
 import sys
+import glob
+import heapq
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import json_codec
+from odds_archive import OddsArchive
 
 # Configure logging
 logging.basicConfig(
@@ -32,6 +40,48 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bumped whenever _migrate_schema gains a step
+SCHEMA_VERSION = 2
+
+def epoch_ms(dt: datetime) -> int:
+    """Integer epoch milliseconds for a (naive local or aware) datetime"""
+    return int(dt.timestamp() * 1000)
+
+def _first(value):
+    """First value of a tshark field, which -T json -e exports as a list"""
+    return value[0] if isinstance(value, list) and value else value
+
+# UTC offsets (hours) for zone abbreviations tshark prints in frame.time
+TZ_OFFSETS = {
+    'UTC': 0, 'GMT': 0, 'EAT': 3, 'CET': 1, 'CEST': 2, 'BST': 1, 'WET': 0, 'WEST': 1,
+    'EST': -5, 'EDT': -4, 'CST': -6, 'CDT': -5, 'MST': -7, 'MDT': -6, 'PST': -8, 'PDT': -7,
+}
+MONTHS = {name: i for i, name in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), 1)}
+
+@lru_cache(maxsize=1024)
+def _midnight_epoch(date_part: str, tz: str) -> float:
+    """Epoch seconds of 00:00 on a tshark date such as 'Oct  3, 2025' in zone tz"""
+    month, day, year = date_part.replace(',', '').split()
+    midnight = datetime(int(year), MONTHS[month], int(day))
+    if tz in TZ_OFFSETS:
+        return (midnight - datetime(1970, 1, 1)).total_seconds() - TZ_OFFSETS[tz] * 3600
+    # Unknown zone: treat as the local time of this host
+    return midnight.timestamp()
+
+def parse_frame_time(value: str) -> float:
+    """Parse tshark frame.time ('Oct  3, 2025 01:56:06.797552000 EDT') to epoch seconds
+    
+    The date and zone resolve through a small cache, so each call is just
+    slicing out hh:mm:ss.fraction from the fixed-layout time field.
+    """
+    head, _, tz = value.rpartition(' ')
+    if not tz.isalpha():
+        head, tz = value, ''
+    date_part, _, clock = head.rpartition(' ')
+    return (_midnight_epoch(date_part, tz)
+            + int(clock[0:2]) * 3600 + int(clock[3:5]) * 60 + float(clock[6:]))
+
 @dataclass
 class OddsChange:
     """Represents a betting odds change event"""
@@ -43,6 +93,8 @@ class OddsChange:
     change_magnitude: float
     source_ip: str
     api_endpoint: str
+    selection: str = ''
+    elapsed: Optional[float] = None  # Seconds since the market's previous sighting
 
 @dataclass
 class UserBehavior:
@@ -64,13 +116,766 @@ class CompetitorActivity:
     frequency: int
     details: Dict
 
+@dataclass(frozen=True)
+class UriClassification:
+    """Result of classifying a request URI"""
+    is_api: bool
+    is_betting: bool
+    match_id: str
+    market_type: str
+    odds: Optional[float]
+    selection: str = ''
+
+class UriClassifier:
+    """Compiled rule table for request URIs with a bounded LRU cache
+    
+    URIs are normalized first (numeric cache-buster parameters removed), so
+    repeated endpoint templates resolve to a single cache entry. template()
+    additionally replaces numeric ids in the path and query values with
+    {id}, giving the key used for per-endpoint counters.
+    """
+    
+    VOLATILE_PARAM = re.compile(r'[?&](?:t|ts|_|cb|rnd|nocache|timestamp|_bee_ppp)=[0-9]*(?=&|$)')
+    API_RULE = re.compile(r'/api/|^(?=.*/v)(?=.*(?:bet|odds|live))', re.S)
+    BETTING_RULE = re.compile(r'bet|odds|live|match|sport|market', re.I)
+    MATCH_ID_RULE = re.compile(r'match[_-]?(?:id)?[=:]?([0-9]+)')
+    ODDS_RULE = re.compile(r'odds?[=:]([0-9]*\.?[0-9]+)')
+    SELECTION_RULE = re.compile(r'(?:selection|outcome)(?:_?id)?[=:]([\w.-]+)', re.I)
+    ID_SEGMENT = re.compile(r'(?<=/)(?:[0-9]+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}|[0-9a-fA-F]{16,})(?=/|$)')
+    ID_VALUE = re.compile(r'(?<==)[0-9]+(?:\.[0-9]+)?(?=&|$)')
+    MARKET_RULES = (
+        (re.compile(r'live', re.I), 'live_betting'),
+        (re.compile(r'pre', re.I), 'pre_match'),
+        (re.compile(r'inplay', re.I), 'in_play'),
+    )
+    
+    def __init__(self, cache_size: int = 8192):
+        self._classify_cached = lru_cache(maxsize=cache_size)(self._classify_normalized)
+        self._template_cached = lru_cache(maxsize=cache_size)(self._template_normalized)
+    
+    def normalize(self, uri: str) -> str:
+        """Strip volatile query parameters that do not affect classification"""
+        if '=' not in uri:
+            return uri
+        normalized = self.VOLATILE_PARAM.sub('', uri)
+        if '?' in uri and '?' not in normalized:
+            # The leading parameter was removed along with its '?'
+            normalized = normalized.replace('&', '?', 1)
+        return normalized
+    
+    def classify(self, uri: str) -> UriClassification:
+        """Classify a URI, served from the cache when its normalized form was seen"""
+        return self._classify_cached(self.normalize(uri))
+    
+    def template(self, uri: str) -> str:
+        """Endpoint template for a URI, e.g. /api/v1/odds?match_id={id}&odds={id}"""
+        return self._template_cached(self.normalize(uri))
+    
+    def _template_normalized(self, uri: str) -> str:
+        path, sep, query = uri.partition('?')
+        path = self.ID_SEGMENT.sub('{id}', path)
+        return path + sep + self.ID_VALUE.sub('{id}', query) if sep else path
+    
+    def _classify_normalized(self, uri: str) -> UriClassification:
+        match_id = self.MATCH_ID_RULE.search(uri)
+        odds = self.ODDS_RULE.search(uri)
+        selection = self.SELECTION_RULE.search(uri)
+        market_type = next((name for rule, name in self.MARKET_RULES if rule.search(uri)), 'unknown')
+        return UriClassification(
+            is_api=self.API_RULE.search(uri) is not None,
+            is_betting=self.BETTING_RULE.search(uri) is not None,
+            match_id=match_id.group(1) if match_id else 'unknown',
+            market_type=market_type,
+            odds=float(odds.group(1)) if odds else None,
+            selection=selection.group(1) if selection else ''
+        )
+    
+    def stats(self) -> Dict:
+        """Cache hit/miss counters"""
+        info = self._classify_cached.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'max_size': info.maxsize,
+            'hit_rate': info.hits / lookups if lookups else 0.0
+        }
+
+class _MarketState:
+    """Last observed price for one market"""
+    __slots__ = ('odds', 'last_seen')
+    
+    def __init__(self, odds: float, last_seen: float):
+        self.odds = odds
+        self.last_seen = last_seen
+
+class OddsStateStore:
+    """Last odds per (match_id, market_type, selection) with idle eviction
+    
+    Markets are kept in last-seen order, so idle ones are evicted from the
+    front in O(1) each and memory stays bounded by live markets.
+    """
+    
+    def __init__(self, idle_ttl: float = 3600.0, max_markets: int = 100000):
+        self.idle_ttl = idle_ttl
+        self.max_markets = max_markets
+        self._markets = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._markets)
+    
+    def update(self, key: Tuple[str, str, str], odds: float, seen: float) -> Optional[Tuple[float, float]]:
+        """Record a price and return the market's previous (odds, last_seen), if any"""
+        state = self._markets.get(key)
+        if state is None:
+            previous = None
+            self._markets[key] = _MarketState(odds, seen)
+            if len(self._markets) > self.max_markets:
+                self._markets.popitem(last=False)
+        else:
+            previous = (state.odds, state.last_seen)
+            state.odds = odds
+            state.last_seen = max(state.last_seen, seen)
+            self._markets.move_to_end(key)
+        
+        self._evict_idle(seen)
+        return previous
+    
+    def _evict_idle(self, now: float):
+        markets = self._markets
+        while markets:
+            oldest = next(iter(markets.values()))
+            if now - oldest.last_seen <= self.idle_ttl:
+                break
+            markets.popitem(last=False)
+    
+    def merge(self, other: 'OddsStateStore'):
+        """Adopt markets from another store where they were seen more recently"""
+        for key, state in other._markets.items():
+            current = self._markets.get(key)
+            if current is None or state.last_seen >= current.last_seen:
+                self._markets[key] = _MarketState(state.odds, state.last_seen)
+                self._markets.move_to_end(key)
+        while len(self._markets) > self.max_markets:
+            self._markets.popitem(last=False)
+
+class _QuicFlow:
+    """Traffic attributed to one QUIC connection"""
+    __slots__ = ('server_name', 'packets', 'bytes', 'first_seen', 'last_seen')
+    
+    def __init__(self, server_name: str, seen: float):
+        self.server_name = server_name
+        self.packets = 0
+        self.bytes = 0
+        self.first_seen = seen
+        self.last_seen = seen
+
+class QuicFlowTable:
+    """QUIC connection IDs mapped to the SNI of the connection they belong to
+    
+    A client Initial carrying an SNI registers its DCID (and SCID, when
+    exported). A long-header packet whose DCID is known registers its SCID
+    for the same flow, which picks up the server-chosen ID that later
+    short-header packets are addressed to. Connection IDs are kept in
+    last-seen order and dropped once their flow is idle for idle_timeout.
+    """
+    
+    def __init__(self, idle_timeout: float = 300.0, max_cids: int = 50000):
+        self.idle_timeout = idle_timeout
+        self.max_cids = max_cids
+        self._cids = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._cids)
+    
+    def _register(self, cid: str, flow: _QuicFlow):
+        self._cids[cid] = flow
+        self._cids.move_to_end(cid)
+        if len(self._cids) > self.max_cids:
+            self._cids.popitem(last=False)
+    
+    def observe(self, dcid: str, seen: float, length: int = 0, scid: str = '',
+                server_name: str = '', initial: bool = False, long_header: bool = False) -> Tuple[Optional[_QuicFlow], bool]:
+        """Attribute one packet, returning its flow (or None) and whether the flow is new"""
+        self._evict_idle(seen)
+        flow = self._cids.get(dcid)
+        created = False
+        if flow is None and initial and server_name:
+            flow = _QuicFlow(server_name, seen)
+            created = True
+        if flow is None:
+            return None, False
+        
+        self._register(dcid, flow)
+        if long_header and scid and scid not in self._cids:
+            self._register(scid, flow)
+        flow.packets += 1
+        flow.bytes += length
+        flow.last_seen = max(flow.last_seen, seen)
+        return flow, created
+    
+    def _evict_idle(self, now: float):
+        cids = self._cids
+        while cids:
+            flow = next(iter(cids.values()))
+            if now - flow.last_seen <= self.idle_timeout:
+                break
+            cids.popitem(last=False)
+    
+    def merge(self, other: 'QuicFlowTable'):
+        """Adopt connection IDs from another table where their flow was seen more recently"""
+        for cid, flow in other._cids.items():
+            current = self._cids.get(cid)
+            if current is None or flow.last_seen >= current.last_seen:
+                self._register(cid, flow)
+
+class SpaceSavingCounter:
+    """Approximate top-k counter with fixed memory (Space-Saving)
+    
+    At most capacity keys are tracked. An unseen key replaces the current
+    minimum and inherits its count as error, so every reported count
+    overestimates the true one by at most error(key), and any key with a
+    true count above total / capacity is guaranteed to be tracked.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.total = 0
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []  # (count, key), lazily refreshed
+    
+    def __len__(self) -> int:
+        return len(self._counts)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._counts
+    
+    def __getitem__(self, key: str) -> int:
+        return self._counts.get(key, 0)
+    
+    def add(self, key: str, count: int = 1, error: int = 0):
+        """Count key, evicting the current minimum when the table is full"""
+        self.total += count
+        counts = self._counts
+        if key in counts:
+            counts[key] += count
+            self._errors[key] += error
+            return
+        
+        if len(counts) >= self.capacity:
+            floor = self._pop_min()
+            count += floor
+            error += floor
+        counts[key] = count
+        self._errors[key] = error
+        heapq.heappush(self._heap, (count, key))
+    
+    def _pop_min(self) -> int:
+        heap = self._heap
+        while True:
+            count, key = heap[0]
+            current = self._counts[key]
+            if current == count:
+                heapq.heappop(heap)
+                del self._counts[key]
+                del self._errors[key]
+                return count
+            heapq.heapreplace(heap, (current, key))
+    
+    def error(self, key: str) -> int:
+        """Upper bound on how much key's count is overestimated"""
+        return self._errors.get(key, 0)
+    
+    def items(self) -> List[Tuple[str, int]]:
+        """(key, count) pairs, highest count first"""
+        return sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+    
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        return self.items()[:n]
+    
+    def merge(self, other: 'SpaceSavingCounter'):
+        """Fold another counter's keys, counts and error bounds into this one"""
+        for key, count in other._counts.items():
+            self.add(key, count, other._errors[key])
+        # Counts other had already evicted still belong in the total
+        self.total += other.total - sum(other._counts.values())
+
+RATE_WINDOWS = (60, 300, 900)  # Seconds covered by the 1, 5 and 15 minute rates
+
+class _WindowRing:
+    """Fixed ring of event counts, one bucket per width seconds"""
+    __slots__ = ('width', 'counts', 'stamps')
+    
+    def __init__(self, buckets: int, width: int):
+        self.width = width
+        self.counts = [0] * buckets
+        self.stamps = [-1] * buckets  # Bucket index held by each slot
+    
+    def add(self, ts: float, count: int = 1):
+        index = int(ts) // self.width
+        slot = index % len(self.counts)
+        stamp = self.stamps[slot]
+        if stamp != index:
+            if stamp > index:
+                return  # Older than the ring covers
+            self.stamps[slot] = index
+            self.counts[slot] = 0
+        self.counts[slot] += count
+    
+    def total(self, now: float, buckets: int) -> int:
+        """Events in the last buckets buckets, ending with the one holding now"""
+        newest = int(now) // self.width
+        oldest = newest - buckets
+        return sum(count for count, stamp in zip(self.counts, self.stamps) if oldest < stamp <= newest)
+    
+    def merge(self, other: '_WindowRing'):
+        for count, stamp in zip(other.counts, other.stamps):
+            if count:
+                self.add(stamp * other.width, count)
+
+class _RateCounter:
+    """Per-second and per-minute rings for one key"""
+    __slots__ = ('seconds', 'minutes', 'last_seen')
+    
+    def __init__(self, second_buckets: int, minute_buckets: int):
+        self.seconds = _WindowRing(second_buckets, 1)
+        self.minutes = _WindowRing(minute_buckets, 60)
+        self.last_seen = 0.0
+
+class RateTracker:
+    """Sliding-window event rates per key, driven by capture timestamps
+    
+    Every key keeps a ring of one-second buckets for the last minute and a
+    ring of one-minute buckets for longer windows, so an update is O(1) and
+    a rate query is O(buckets). now is the latest capture time seen rather
+    than the wall clock, so replayed captures produce the rates they had
+    when recorded. Keys idle for longer than idle_ttl are evicted.
+    """
+    
+    def __init__(self, second_buckets: int = 60, minute_buckets: int = 15,
+                 idle_ttl: float = 900.0, max_keys: int = 10000):
+        self.second_buckets = second_buckets
+        self.minute_buckets = minute_buckets
+        self.idle_ttl = idle_ttl
+        self.max_keys = max_keys
+        self.now = 0.0
+        self._counters = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._counters)
+    
+    def _counter(self, key) -> _RateCounter:
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = _RateCounter(self.second_buckets, self.minute_buckets)
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        else:
+            self._counters.move_to_end(key)
+        return counter
+    
+    def add(self, key, ts: float, count: int = 1):
+        """Count events for key at capture time ts"""
+        counter = self._counter(key)
+        counter.seconds.add(ts, count)
+        counter.minutes.add(ts, count)
+        if ts > counter.last_seen:
+            counter.last_seen = ts
+        if ts > self.now:
+            self.now = ts
+            self._evict_idle()
+    
+    def _evict_idle(self):
+        counters = self._counters
+        while counters:
+            oldest = next(iter(counters.values()))
+            if self.now - oldest.last_seen <= self.idle_ttl:
+                break
+            counters.popitem(last=False)
+    
+    def count(self, key, window: int = 60) -> int:
+        """Events for key in the last window seconds up to now"""
+        counter = self._counters.get(key)
+        if counter is None:
+            return 0
+        if window <= self.second_buckets:
+            return counter.seconds.total(self.now, window)
+        return counter.minutes.total(self.now, min(window // 60, self.minute_buckets))
+    
+    def per_minute(self, key, window: int = 60) -> float:
+        """Average events per minute for key over the last window seconds"""
+        return self.count(key, window) * 60.0 / window
+    
+    def rates(self, key) -> Dict[str, float]:
+        """Events per minute over each of RATE_WINDOWS"""
+        return {f"{window // 60}m": self.per_minute(key, window) for window in RATE_WINDOWS}
+    
+    def merge(self, other: 'RateTracker'):
+        """Add another tracker's buckets into this one"""
+        for key, theirs in other._counters.items():
+            counter = self._counter(key)
+            counter.seconds.merge(theirs.seconds)
+            counter.minutes.merge(theirs.minutes)
+            counter.last_seen = max(counter.last_seen, theirs.last_seen)
+        if other.now > self.now:
+            self.now = other.now
+            self._evict_idle()
+
+def detect_rapid_moves(old_odds: np.ndarray, new_odds: np.ndarray, elapsed: np.ndarray,
+                       window: float, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Find price moves larger than threshold within window seconds of the market's previous price
+    
+    Each row is one market's move from old_odds to new_odds, elapsed seconds
+    after that market was last seen (NaN when unknown), as recorded by
+    OddsStateStore. Returns the indices of the rapid moves with their
+    relative magnitudes.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        magnitude = np.abs(new_odds - old_odds) / old_odds
+    hits = np.flatnonzero((old_odds > 0) & (elapsed < window) & (magnitude > threshold))
+    return hits, magnitude[hits]
+
+class _ReportBucket:
+    """Aggregates for one bucket_seconds slice of the report window"""
+    __slots__ = ('start', 'odds_changes', 'rapid_changes', 'markets', 'severities', 'alert_types')
+    
+    def __init__(self, start: int):
+        self.start = start
+        self.odds_changes = 0
+        self.rapid_changes = 0
+        self.markets = Counter()
+        self.severities = Counter()
+        self.alert_types = Counter()
+
+class ReportAggregates:
+    """Running report counters over a sliding window, updated as rows are stored
+    
+    The window is a fixed ring of time buckets, so a snapshot costs the same
+    regardless of how many rows were stored. dirty is set whenever stored
+    rows or buckets aging out of the window change the snapshot.
+    """
+    
+    def __init__(self, window_seconds: int = 3600, bucket_seconds: int = 60,
+                 rapid_threshold: float = 0.1, recent_alerts: int = 20):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.rapid_threshold = rapid_threshold
+        self._buckets = [None] * (window_seconds // bucket_seconds)
+        self._recent_alerts = deque(maxlen=recent_alerts)
+        self.dirty = True
+    
+    def _bucket(self, ts: float) -> Optional[_ReportBucket]:
+        """Bucket for an epoch timestamp, or None if it is outside the window"""
+        start = int(ts) // self.bucket_seconds * self.bucket_seconds
+        if start <= time.time() - self.window_seconds:
+            return None
+        slot = (start // self.bucket_seconds) % len(self._buckets)
+        bucket = self._buckets[slot]
+        if bucket is None or bucket.start != start:
+            if bucket is not None and bucket.start > start:
+                return None  # Slot already holds a newer bucket
+            bucket = self._buckets[slot] = _ReportBucket(start)
+        return bucket
+    
+    def add_odds_change(self, ts: float, market_type: str, magnitude: float):
+        bucket = self._bucket(ts)
+        if bucket is not None:
+            bucket.odds_changes += 1
+            bucket.markets[market_type] += 1
+            if magnitude > self.rapid_threshold:
+                bucket.rapid_changes += 1
+            self.dirty = True
+    
+    def add_alert(self, ts: float, timestamp: str, alert_type: str, severity: str, description: str):
+        bucket = self._bucket(ts)
+        if bucket is not None:
+            bucket.severities[severity] += 1
+            bucket.alert_types[alert_type] += 1
+            self._recent_alerts.append((ts, timestamp, alert_type, severity, description))
+            self.dirty = True
+    
+    def expire(self, now: Optional[float] = None):
+        """Drop buckets that left the window, marking the report dirty if they held data"""
+        cutoff = (now or time.time()) - self.window_seconds
+        for slot, bucket in enumerate(self._buckets):
+            if bucket is not None and bucket.start <= cutoff:
+                self._buckets[slot] = None
+                self.dirty = True
+        while self._recent_alerts and self._recent_alerts[0][0] <= cutoff:
+            self._recent_alerts.popleft()
+    
+    def snapshot(self) -> Dict:
+        """Sum the live buckets into report totals"""
+        self.expire()
+        totals = {'odds_changes': 0, 'rapid_changes': 0, 'markets': Counter(),
+                  'severities': Counter(), 'alert_types': Counter()}
+        for bucket in self._buckets:
+            if bucket is not None:
+                totals['odds_changes'] += bucket.odds_changes
+                totals['rapid_changes'] += bucket.rapid_changes
+                totals['markets'].update(bucket.markets)
+                totals['severities'].update(bucket.severities)
+                totals['alert_types'].update(bucket.alert_types)
+        totals['recent_alerts'] = list(reversed(self._recent_alerts))
+        return totals
+
+class PacketFileTailer:
+    """Follows an append-only JSONL packet file from a byte-offset checkpoint"""
+
+    def __init__(self, path: str, inode: Optional[int] = None, offset: int = 0):
+        self.path = path
+        self.inode = inode
+        self.offset = offset
+
+    def has_new_data(self) -> bool:
+        """Check for appended bytes, resetting the offset on truncation or rotation"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+
+        if self.inode is not None and st.st_ino != self.inode:
+            logger.info(f"Packet file rotated, restarting from 0: {self.path}")
+            self.offset = 0
+        elif st.st_size < self.offset:
+            logger.info(f"Packet file truncated, restarting from 0: {self.path}")
+            self.offset = 0
+        self.inode = st.st_ino
+
+        return st.st_size > self.offset
+
+    def iter_new_lines(self):
+        """Yield complete lines appended since the checkpoint, advancing it as they are read
+
+        A trailing line without a newline is left for the next call.
+        """
+        if not self.has_new_data():
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                self.offset += len(line)
+                yield line
+
+class _OpenAlert:
+    """Stored alert that repeats of the same fingerprint are folded into"""
+    __slots__ = ('first_seen_ms', 'last_seen', 'occurrences')
+    
+    def __init__(self, first_seen_ms: int, last_seen: float, occurrences: int = 1):
+        self.first_seen_ms = first_seen_ms
+        self.last_seen = last_seen
+        self.occurrences = occurrences
+
+class AlertSuppressor:
+    """Open alerts by fingerprint, so repeats within window only bump a counter
+    
+    The window slides: a condition that keeps re-firing at least once per
+    window stays folded into its first alert. Alerts are kept in last-seen
+    order and closed once idle for longer than window.
+    """
+    
+    def __init__(self, window: float = 300.0, max_open: int = 10000):
+        self.window = window
+        self.max_open = max_open
+        self._open = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._open)
+    
+    def open(self, fingerprint: str, first_seen_ms: int, last_seen: float, occurrences: int = 1):
+        """Track a stored alert as the target for later repeats"""
+        self._open[fingerprint] = _OpenAlert(first_seen_ms, last_seen, occurrences)
+        self._open.move_to_end(fingerprint)
+        if len(self._open) > self.max_open:
+            self._open.popitem(last=False)
+    
+    def repeat(self, fingerprint: str, seen: float) -> Optional[_OpenAlert]:
+        """Fold an occurrence into its open alert, or return None if it should be stored"""
+        self._close_idle(seen)
+        alert = self._open.get(fingerprint)
+        if alert is None or seen - alert.last_seen > self.window:
+            return None
+        alert.occurrences += 1
+        alert.last_seen = max(alert.last_seen, seen)
+        self._open.move_to_end(fingerprint)
+        return alert
+    
+    def _close_idle(self, now: float):
+        alerts = self._open
+        while alerts:
+            oldest = next(iter(alerts.values()))
+            if now - oldest.last_seen <= self.window:
+                break
+            alerts.popitem(last=False)
+
+class PatternStore:
+    """Long-lived SQLite connection that buffers rows and writes them in group commits
+    
+    Rows are queued per statement and written with executemany in a single
+    transaction once batch_size rows are pending, flush_interval seconds
+    have passed, or on flush()/close(). Statements run in INSERT_SQL order.
+    add_many() queues several tables as one unit, so a threshold can never
+    commit part of them; its after_commit callbacks run once they are on disk.
+    """
+    
+    INSERT_SQL = {
+        'odds_changes': """
+            INSERT INTO odds_changes
+            (timestamp, match_id, market_type, old_odds, new_odds, change_magnitude, source_ip, api_endpoint, ts_epoch_ms)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        'competitor_activity': """
+            INSERT INTO competitor_activity (domain, timestamp, activity_type, frequency, details, ts_epoch_ms)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        'pattern_alerts': """
+            INSERT INTO pattern_alerts
+            (timestamp, alert_type, severity, description, data, ts_epoch_ms, fingerprint, occurrences, last_seen_epoch_ms)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        # Suppressed repeats, applied after the alert rows they update
+        'alert_occurrences': """
+            UPDATE pattern_alerts SET occurrences = ?, last_seen_epoch_ms = ?
+            WHERE fingerprint = ? AND ts_epoch_ms = ?
+        """,
+        # Checkpoints are written last so they never commit ahead of their rows
+        'ingest_checkpoints': """
+            INSERT OR REPLACE INTO ingest_checkpoints (path, inode, offset, updated_at)
+            VALUES (?, ?, ?, ?)
+        """,
+    }
+    
+    def __init__(self, db_path: str, batch_size: int = 5000, flush_interval: float = 1.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        
+        self._lock = threading.RLock()
+        self._pending = {table: [] for table in self.INSERT_SQL}
+        self._pending_count = 0
+        self._after_commit = []
+        self._last_flush = time.monotonic()
+    
+    def add(self, table: str, rows: List[tuple]):
+        """Queue rows for insertion, flushing if a threshold is reached"""
+        if not rows:
+            return
+        with self._lock:
+            self._pending[table].extend(rows)
+            self._pending_count += len(rows)
+        self.maybe_flush()
+    
+    def add_many(self, rows_by_table: Dict[str, List[tuple]], after_commit: Optional[Callable[[], None]] = None):
+        """Queue rows for several tables without checking thresholds
+        
+        The caller flushes (usually maybe_flush()) once the whole unit is
+        queued. after_commit runs after the transaction holding these rows.
+        """
+        with self._lock:
+            for table, rows in rows_by_table.items():
+                self._pending[table].extend(rows)
+                self._pending_count += len(rows)
+            if after_commit is not None:
+                self._after_commit.append(after_commit)
+    
+    def maybe_flush(self):
+        """Flush if enough rows are pending or the flush interval has elapsed"""
+        if self._pending_count >= self.batch_size or (
+                self._pending_count and time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+    
+    def flush(self):
+        """Write all pending rows in one transaction, then run after_commit callbacks"""
+        with self._lock:
+            if self._pending_count:
+                with self.conn:
+                    for table, sql in self.INSERT_SQL.items():
+                        rows = self._pending[table]
+                        if rows:
+                            self.conn.executemany(sql, rows)
+                            rows.clear()
+                self._pending_count = 0
+            self._last_flush = time.monotonic()
+            callbacks, self._after_commit = self._after_commit, []
+        
+        for callback in callbacks:
+            callback()
+    
+    def execute(self, sql: str, params: tuple = ()):
+        """Run a statement on the shared connection"""
+        with self._lock:
+            return self.conn.execute(sql, params)
+    
+    def close(self):
+        """Flush pending rows and close the connection"""
+        self.flush()
+        self.conn.close()
+
+_worker_engine = None
+
+def _init_worker(db_path: str):
+    """Create the per-process engine used by backfill workers"""
+    global _worker_engine
+    _worker_engine = PatternAnalysisEngine(db_path=db_path)
+
+def _scan_packets_file(path: str, inode: Optional[int], offset: int,
+                       engine: Optional['PatternAnalysisEngine'] = None) -> Tuple[Dict, PacketFileTailer]:
+    """Worker entry point: parse one packet file from its checkpoint without running detectors"""
+    in_worker = engine is None
+    engine = engine or _worker_engine
+    results = engine._new_results()
+    if in_worker:
+        engine._fresh_stream_state(results)
+    
+    tailer = PacketFileTailer(path, inode, offset)
+    lines = engine._track_progress(tailer.iter_new_lines(), path, os.path.getsize(path))
+    engine._scan_packets(lines, results)
+    return results, tailer
+
+def discover_packet_files(pattern: str) -> List[str]:
+    """Expand a packets file glob into the existing session files, oldest first"""
+    return sorted(glob.glob(pattern))
+
+def merge_analysis_results(into: Dict, partial: Dict) -> Dict:
+    """Fold one file's partial analysis results into an accumulated result"""
+    into['total_packets'] += partial.get('total_packets', 0)
+    if partial.get('last_capture_time', 0.0) > into.get('last_capture_time', 0.0):
+        into['last_capture_time'] = partial['last_capture_time']
+    into['betting_events'] += partial.get('betting_events', 0)
+    for key in ('odds_changes', 'user_patterns', 'suspicious_activity', 'competitor_activity', 'checkpoints'):
+        if partial.get(key):
+            into.setdefault(key, []).extend(partial[key])
+    if 'api_calls' in partial:
+        into['api_calls'].merge(partial['api_calls'])
+    for server_name, totals in partial.get('quic_traffic', {}).items():
+        into_totals = into.setdefault('quic_traffic', {}).setdefault(server_name, [0, 0, 0])
+        for i, value in enumerate(totals):
+            into_totals[i] += value
+    return into
+
 class PatternAnalysisEngine:
     """Advanced ML-based pattern analysis for betting data"""
     
-    def __init__(self, db_path: str = "pattern_analysis.db"):
+    def __init__(self, db_path: str = "pattern_analysis.db", archive_dir: Optional[str] = None,
+                 alert_suppression_window: float = 300.0):
         self.db_path = db_path
+        self.store = PatternStore(db_path)
         self.init_database()
         
+        # Columnar odds history kept next to the database
+        self.archive = OddsArchive(archive_dir or f"{os.path.splitext(db_path)[0]}_archive")
+        
         # Pattern detection windows
         self.odds_window = deque(maxlen=1000)  # Last 1000 odds changes
         self.user_sessions = defaultdict(list)  # User behavior tracking
@@ -82,13 +887,49 @@ class PatternAnalysisEngine:
         
         # Real-time thresholds
         self.odds_threshold = 0.1  # 10% change threshold
+        self.rapid_move_window = 60.0  # Seconds between prices that count as a rapid move
+        self.max_alert_samples = 100  # Largest moves included in a rapid_odds_changes alert
         self.frequency_threshold = 10  # API calls per minute
+        self.betting_rate_threshold = 100  # Betting events per minute
+        self.alert_suppression_window = alert_suppression_window  # Seconds a repeated alert stays folded into the open one
+        self.api_call_capacity = 1024  # Endpoint templates tracked per analysis cycle
+        
+        # URI classification with memoization
+        self.uri_classifier = UriClassifier()
+        
+        # Last price per market, kept across real-time cycles
+        self.odds_state = OddsStateStore()
+        
+        # Per-endpoint and per-category event rates, kept across real-time cycles
+        self.rate_tracker = RateTracker()
+        
+        # QUIC connection IDs attributed to server names, kept across real-time cycles
+        self.quic_flows = QuicFlowTable()
+        self.competitor_domains = ('betika', 'bet365', 'sportpesa')
+        
+        # Running aggregates behind generate_intelligence_report
+        self.report_aggregates = ReportAggregates(rapid_threshold=self.odds_threshold)
+        self._last_report = None
+        self._saved_report = None
+        self.report_betting_rate = 20  # Betting events per minute that warrant a report
+        self.report_interval = 60.0  # Minimum seconds between saved reports
+        self._last_report_saved_at = None
+        self._load_report_aggregates()
+        
+        # Repeats of an open alert within the window are folded into it
+        self.alert_suppressor = AlertSuppressor(window=self.alert_suppression_window)
+        self._load_open_alerts()
+        
+        # Tail-follow state for real-time ingestion
+        self.poll_interval = 0.5  # Seconds between checks for appended data
+        self.tailers = {}
+        self.progress_interval = 100000  # Lines between progress log entries
         
         logger.info("Pattern Analysis Engine initialized")
 
     def init_database(self):
         """Initialize SQLite database for pattern storage"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.store.conn
         cursor = conn.cursor()
         
         # Odds changes table
@@ -102,7 +943,8 @@ class PatternAnalysisEngine:
                 new_odds REAL,
                 change_magnitude REAL,
                 source_ip TEXT,
-                api_endpoint TEXT
+                api_endpoint TEXT,
+                ts_epoch_ms INTEGER
             )
         """)
         
@@ -128,7 +970,8 @@ class PatternAnalysisEngine:
                 timestamp TEXT NOT NULL,
                 activity_type TEXT,
                 frequency INTEGER,
-                details TEXT
+                details TEXT,
+                ts_epoch_ms INTEGER
             )
         """)
         
@@ -140,123 +983,342 @@ class PatternAnalysisEngine:
                 alert_type TEXT,
                 severity TEXT,
                 description TEXT,
-                data TEXT
+                data TEXT,
+                ts_epoch_ms INTEGER,
+                fingerprint TEXT,
+                occurrences INTEGER NOT NULL DEFAULT 1,
+                last_seen_epoch_ms INTEGER
+            )
+        """)
+        
+        # Byte-offset checkpoints for tail-followed packet files
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+                path TEXT PRIMARY KEY,
+                inode INTEGER,
+                offset INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
             )
         """)
         
         conn.commit()
-        conn.close()
+        self._migrate_schema()
         logger.info("Database initialized successfully")
 
+    def _migrate_schema(self):
+        """Bring existing databases up to SCHEMA_VERSION
+        
+        Version 1 adds integer epoch timestamps and time indexes; older
+        databases only carry ISO text timestamps. The column is added in
+        place and back-filled in small committed batches, so readers in WAL
+        mode are never blocked for long. Version 2 adds the alert
+        fingerprint and occurrence columns used for suppression.
+        """
+        conn = self.store.conn
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        
+        if version < 1:
+            for table in ('odds_changes', 'competitor_activity', 'pattern_alerts'):
+                self._add_column(table, 'ts_epoch_ms', 'INTEGER')
+                
+                while True:
+                    # Stored text timestamps are naive local time, as written by datetime.isoformat()
+                    with conn:
+                        updated = conn.execute(f"""
+                            UPDATE {table}
+                            SET ts_epoch_ms = CAST(ROUND((julianday(timestamp, 'utc') - 2440587.5) * 86400000) AS INTEGER)
+                            WHERE rowid IN (SELECT rowid FROM {table} WHERE ts_epoch_ms IS NULL LIMIT 10000)
+                        """).rowcount
+                    if updated == 0:
+                        break
+            
+            with conn:
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_odds_changes_ts ON odds_changes (ts_epoch_ms, market_type, change_magnitude)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_odds_changes_match_ts ON odds_changes (match_id, ts_epoch_ms)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_competitor_activity_ts ON competitor_activity (ts_epoch_ms)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_pattern_alerts_ts ON pattern_alerts (ts_epoch_ms)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_pattern_alerts_type_ts ON pattern_alerts (alert_type, ts_epoch_ms)")
+                conn.execute("PRAGMA user_version = 1")
+        
+        if version < 2:
+            self._add_column('pattern_alerts', 'fingerprint', 'TEXT')
+            self._add_column('pattern_alerts', 'occurrences', 'INTEGER NOT NULL DEFAULT 1')
+            self._add_column('pattern_alerts', 'last_seen_epoch_ms', 'INTEGER')
+            with conn:
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_pattern_alerts_fingerprint ON pattern_alerts (fingerprint, ts_epoch_ms)")
+                conn.execute("PRAGMA user_version = 2")
+
+    def _add_column(self, table: str, column: str, definition: str):
+        """ALTER TABLE ADD COLUMN unless the column already exists"""
+        conn = self.store.conn
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if column not in columns:
+            logger.info(f"Migrating {table}: adding {column}")
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            conn.commit()
+
     def analyze_http_packets(self, packets_file: str) -> Dict:
-        """Analyze HTTP packets for betting patterns"""
+        """Analyze HTTP packets for betting patterns
+        
+        The file is streamed line by line, so memory use does not grow
+        with the size of the capture.
+        """
         if not os.path.exists(packets_file):
             logger.warning(f"Packets file not found: {packets_file}")
             return {}
         
         try:
-            with open(packets_file, 'r') as f:
-                packets = [json.loads(line) for line in f if line.strip()]
-        except Exception as e:
+            with open(packets_file, 'rb') as f:
+                total_bytes = os.fstat(f.fileno()).st_size
+                return self.analyze_packet_lines(self._track_progress(f, packets_file, total_bytes))
+        except OSError as e:
             logger.error(f"Error reading packets file: {e}")
             return {}
-        
-        analysis_results = {
-            'total_packets': len(packets),
+
+    def _track_progress(self, lines, source: str, total_bytes: int):
+        """Pass lines through while logging progress every progress_interval lines"""
+        bytes_read = 0
+        for count, line in enumerate(lines, 1):
+            bytes_read += len(line)
+            if count % self.progress_interval == 0:
+                percent = 100.0 * bytes_read / total_bytes if total_bytes else 100.0
+                logger.info(f"{source}: {count} lines, {bytes_read / 1e6:.1f} MB ({percent:.1f}%)")
+            yield line
+
+    def _iter_packets(self, lines):
+        """Decode JSONL lines into packets one at a time"""
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield json_codec.loads(line)
+            except (*json_codec.DecodeError, UnicodeDecodeError) as e:
+                logger.error(f"Error decoding packet: {e}")
+
+    def analyze_packet_lines(self, lines) -> Dict:
+        """Analyze an iterable of JSONL packet lines for betting patterns"""
+        analysis_results = self._new_results()
+        self._scan_packets(lines, analysis_results)
+        self._run_detectors(analysis_results)
+        return analysis_results
+
+    def _new_results(self) -> Dict:
+        """Create an empty analysis result accumulator"""
+        return {
+            'total_packets': 0,
             'betting_events': 0,
             'odds_changes': [],
             'user_patterns': [],
-            'api_calls': defaultdict(int),
-            'suspicious_activity': []
+            'api_calls': SpaceSavingCounter(self.api_call_capacity),
+            'suspicious_activity': [],
+            'quic_traffic': {}  # server_name -> [packets, bytes, new flows]
         }
-        
-        for packet in packets:
+
+    def _scan_packets(self, lines, results: Dict):
+        """Decode and process packets, folding them into results"""
+        for packet in self._iter_packets(lines):
+            results['total_packets'] += 1
             try:
-                self._process_packet(packet, analysis_results)
+                self._process_packet(packet, results)
             except Exception as e:
                 logger.error(f"Error processing packet: {e}")
                 continue
+
+    def _run_detectors(self, results: Dict):
+        """Run pattern detectors over accumulated results"""
+        self._detect_odds_patterns(results)
+        self._detect_user_patterns(results)
+        self._detect_anomalies(results)
+        self._summarize_quic_traffic(results)
+
+    def analyze_sessions(self, pattern: str, max_workers: Optional[int] = None) -> Dict:
+        """Parse every session file matching pattern in worker processes
         
-        # Detect patterns
-        self._detect_odds_patterns(analysis_results)
-        self._detect_user_patterns(analysis_results)
-        self._detect_anomalies(analysis_results)
+        Each file is parsed from its checkpoint in a separate process and
+        the partial results are merged here before detectors run once.
+        """
+        results = self._new_results()
+        results['checkpoints'] = []
+        jobs = []
+        for path in discover_packet_files(pattern):
+            tailer = self._get_tailer(path)
+            if tailer.has_new_data():
+                jobs.append((path, tailer.inode, tailer.offset))
         
-        return analysis_results
+        if not jobs:
+            return results
+        
+        logger.info(f"Backfilling {len(jobs)} packet files")
+        if len(jobs) == 1 or max_workers == 1:
+            partials = [_scan_packets_file(*job, engine=self) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(self.db_path,)) as pool:
+                partials = list(pool.map(_scan_packets_file, *zip(*jobs)))
+        
+        for partial, tailer in partials:
+            self._merge_stream_state(partial)
+            merge_analysis_results(results, partial)
+            self.tailers[tailer.path] = tailer
+            results['checkpoints'].append(tailer)
+        
+        self._run_detectors(results)
+        return results
+
+    def _fresh_stream_state(self, results: Dict):
+        """Start a backfill worker job from empty market, rate and QUIC flow state
+        
+        The new objects are also referenced from results['stream_state'],
+        so the parent can fold them back in with _merge_stream_state.
+        """
+        self.odds_state = OddsStateStore(self.odds_state.idle_ttl, self.odds_state.max_markets)
+        self.rate_tracker = RateTracker(self.rate_tracker.second_buckets, self.rate_tracker.minute_buckets,
+                                        self.rate_tracker.idle_ttl, self.rate_tracker.max_keys)
+        self.quic_flows = QuicFlowTable(self.quic_flows.idle_timeout, self.quic_flows.max_cids)
+        results['stream_state'] = {
+            'odds_state': self.odds_state,
+            'rate_tracker': self.rate_tracker,
+            'quic_flows': self.quic_flows,
+        }
+
+    def _merge_stream_state(self, partial: Dict):
+        """Fold a worker's stream state into this engine's, removing it from partial"""
+        state = partial.pop('stream_state', None)
+        if state is None:
+            return  # Scanned in this process, directly into our own state
+        self.odds_state.merge(state['odds_state'])
+        self.rate_tracker.merge(state['rate_tracker'])
+        self.quic_flows.merge(state['quic_flows'])
 
     def _process_packet(self, packet: dict, results: dict):
         """Process individual packet for pattern detection"""
         try:
             layers = packet.get('_source', {}).get('layers', {})
+            captured_at = self._capture_time(layers)
+            if captured_at > results.get('last_capture_time', 0.0):
+                results['last_capture_time'] = captured_at
             
             # HTTP analysis
             if 'http' in layers:
                 http_data = layers['http']
-                self._analyze_http_request(http_data, layers, results)
+                self._analyze_http_request(http_data, layers, results, captured_at)
             
-            # QUIC analysis
-            if 'quic' in layers:
-                quic_data = layers['quic']
-                self._analyze_quic_connection(quic_data, layers, results)
+            # QUIC analysis (nested layers, or flat fields from tshark -e)
+            if 'quic' in layers or 'quic.dcid' in layers:
+                quic_data = layers.get('quic', layers)
+                self._analyze_quic_connection(quic_data, layers, results, captured_at)
             
             # TLS analysis for domain detection
             if 'tls' in layers:
                 tls_data = layers['tls']
-                self._analyze_tls_handshake(tls_data, layers, results)
+                self._analyze_tls_handshake(tls_data, layers, results, captured_at)
                 
         except Exception as e:
             logger.debug(f"Error processing packet data: {e}")
 
-    def _analyze_http_request(self, http_data: dict, layers: dict, results: dict):
+    def _capture_time(self, layers: dict) -> float:
+        """Packet capture time in epoch seconds
+        
+        Uses frame.time_epoch when tshark exported it, then frame.time, and
+        only falls back to the wall clock for packets carrying neither.
+        """
+        frame = layers.get('frame', layers)
+        epoch = _first(frame.get('frame.time_epoch'))
+        if epoch:
+            return float(epoch)
+        
+        frame_time = _first(frame.get('frame.time'))
+        if frame_time:
+            try:
+                return parse_frame_time(frame_time)
+            except (ValueError, KeyError, IndexError):
+                logger.debug(f"Unparseable frame.time: {frame_time}")
+        return time.time()
+
+    def _analyze_http_request(self, http_data: dict, layers: dict, results: dict, captured_at: float):
         """Analyze HTTP request for betting patterns"""
         method = http_data.get('http.request.method', 'GET')
         uri = http_data.get('http.request.uri', '')
+        classification = self.uri_classifier.classify(uri)
         
         # Track API calls
-        if '/api/' in uri or '/v' in uri and any(x in uri for x in ['bet', 'odds', 'live']):
-            results['api_calls'][uri] += 1
+        if classification.is_api:
+            endpoint = self.uri_classifier.template(uri)
+            results['api_calls'].add(endpoint)
+            self.rate_tracker.add(('endpoint', endpoint), captured_at)
+            self.rate_tracker.add(('category', 'api'), captured_at)
             
         # Detect betting-related endpoints
-        betting_keywords = ['bet', 'odds', 'live', 'match', 'sport', 'market']
-        if any(keyword in uri.lower() for keyword in betting_keywords):
+        if classification.is_betting:
             results['betting_events'] += 1
+            self.rate_tracker.add(('category', 'betting'), captured_at)
             
-            # Extract potential odds data
-            odds_match = re.search(r'odds?[=:]([0-9.]+)', uri)
-            if odds_match:
-                odds_value = float(odds_match.group(1))
-                
-                # Create odds change event
-                odds_change = OddsChange(
-                    timestamp=datetime.now(),
-                    match_id=self._extract_match_id(uri),
-                    market_type=self._extract_market_type(uri),
-                    old_odds=0.0,  # Would need historical data
-                    new_odds=odds_value,
-                    change_magnitude=0.0,
-                    source_ip=layers.get('ip', {}).get('ip.src', ''),
-                    api_endpoint=uri
-                )
+            # Extract potential odds data; without a match id there is no market to compare against
+            if classification.odds is not None and classification.match_id != 'unknown':
+                new_odds = classification.odds
+                market = (classification.match_id, classification.market_type, classification.selection)
+                previous = self.odds_state.update(market, new_odds, captured_at)
                 
-                results['odds_changes'].append(odds_change)
-
-    def _analyze_quic_connection(self, quic_data: dict, layers: dict, results: dict):
-        """Analyze QUIC connections for HTTP/3 betting traffic"""
-        connection_id = quic_data.get('quic.connection.id')
-        if connection_id:
-            # Track QUIC connections to betting domains
-            ip_dst = layers.get('ip', {}).get('ip.dst', '')
-            if any(domain in ip_dst for domain in ['betika', 'live', 'api']):
-                logger.info(f"HTTP/3 betting connection detected: {connection_id}")
-
-    def _analyze_tls_handshake(self, tls_data: dict, layers: dict, results: dict):
+                # The first sighting only primes the market; unchanged prices are not changes
+                if previous is not None and previous[0] != new_odds:
+                    old_odds, last_seen = previous
+                    odds_change = OddsChange(
+                        timestamp=datetime.fromtimestamp(captured_at),
+                        match_id=classification.match_id,
+                        market_type=classification.market_type,
+                        old_odds=old_odds,
+                        new_odds=new_odds,
+                        change_magnitude=abs(new_odds - old_odds) / old_odds if old_odds > 0 else 0.0,
+                        source_ip=layers.get('ip', {}).get('ip.src', ''),
+                        api_endpoint=uri,
+                        selection=classification.selection,
+                        elapsed=max(captured_at - last_seen, 0.0)
+                    )
+                    
+                    results['odds_changes'].append(odds_change)
+                    self.rate_tracker.add(('category', 'odds'), captured_at)
+
+    def _analyze_quic_connection(self, quic_data: dict, layers: dict, results: dict, captured_at: float):
+        """Attribute QUIC packets to the server name of their connection"""
+        if isinstance(quic_data, list):
+            quic_data = quic_data[0]  # Coalesced packets share the first one's connection
+        dcid = _first(quic_data.get('quic.dcid'))
+        if not dcid:
+            return
+        
+        long_header = _first(quic_data.get('quic.header_form')) in ('1', 'True', 'true')
+        initial = long_header and _first(quic_data.get('quic.long.packet_type')) == '0'
+        server_name = ''
+        if initial:
+            tls_data = layers.get('tls') or quic_data.get('tls') or layers
+            server_name = _first(tls_data.get('tls.handshake.extensions_server_name')) or ''
+        length = int(_first(layers.get('frame', layers).get('frame.len')) or 0)
+        
+        flow, created = self.quic_flows.observe(
+            dcid, captured_at, length, scid=_first(quic_data.get('quic.scid')) or '',
+            server_name=server_name, initial=initial, long_header=long_header
+        )
+        if flow is None:
+            return
+        
+        totals = results['quic_traffic'].setdefault(flow.server_name, [0, 0, 0])
+        totals[0] += 1
+        totals[1] += length
+        if created:
+            totals[2] += 1
+            if any(domain in flow.server_name for domain in self.competitor_domains):
+                logger.info(f"HTTP/3 betting connection detected: {flow.server_name} ({dcid})")
+
+    def _analyze_tls_handshake(self, tls_data: dict, layers: dict, results: dict, captured_at: float):
         """Analyze TLS handshakes for domain identification"""
         server_name = tls_data.get('tls.handshake.extensions_server_name')
-        if server_name and any(domain in server_name for domain in ['betika', 'bet365', 'sportpesa']):
+        if server_name and any(domain in server_name for domain in self.competitor_domains):
             # Track competitor activity
             competitor_activity = CompetitorActivity(
                 domain=server_name,
-                timestamp=datetime.now(),
+                timestamp=datetime.fromtimestamp(captured_at),
                 activity_type='tls_handshake',
                 frequency=1,
                 details={'ip': layers.get('ip', {}).get('ip.dst', '')}
@@ -266,208 +1328,363 @@ class PatternAnalysisEngine:
 
     def _extract_match_id(self, uri: str) -> str:
         """Extract match ID from URI"""
-        match = re.search(r'match[_-]?(?:id)?[=:]?([0-9]+)', uri)
-        return match.group(1) if match else 'unknown'
+        return self.uri_classifier.classify(uri).match_id
 
     def _extract_market_type(self, uri: str) -> str:
         """Extract market type from URI"""
-        if 'live' in uri.lower():
-            return 'live_betting'
-        elif 'pre' in uri.lower():
-            return 'pre_match'
-        elif 'inplay' in uri.lower():
-            return 'in_play'
-        else:
-            return 'unknown'
+        return self.uri_classifier.classify(uri).market_type
 
     def _detect_odds_patterns(self, results: dict):
         """Detect betting odds patterns and anomalies"""
         odds_changes = results.get('odds_changes', [])
         
-        if len(odds_changes) < 2:
+        if not odds_changes:
             return
         
-        # Analyze odds movement patterns
-        rapid_changes = []
-        for i in range(1, len(odds_changes)):
-            current = odds_changes[i]
-            previous = odds_changes[i-1]
-            
-            if (current.timestamp - previous.timestamp).seconds < 60:  # Less than 1 minute
-                magnitude = abs(current.new_odds - previous.new_odds) / previous.new_odds
-                if magnitude > self.odds_threshold:
-                    rapid_changes.append({
-                        'match_id': current.match_id,
-                        'magnitude': magnitude,
-                        'timespan': (current.timestamp - previous.timestamp).seconds
-                    })
-        
-        if rapid_changes:
-            self._create_alert('rapid_odds_changes', 'HIGH', f"Detected {len(rapid_changes)} rapid odds changes", rapid_changes)
+        # Each change already carries its market's previous price and last-seen time
+        # (see OddsStateStore), so moves across analysis cycles are caught too
+        count = len(odds_changes)
+        old_odds = np.fromiter((c.old_odds for c in odds_changes), dtype=np.float64, count=count)
+        new_odds = np.fromiter((c.new_odds for c in odds_changes), dtype=np.float64, count=count)
+        elapsed = np.fromiter((np.nan if c.elapsed is None else c.elapsed for c in odds_changes),
+                              dtype=np.float64, count=count)
+        
+        indices, magnitudes = detect_rapid_moves(old_odds, new_odds, elapsed,
+                                                 self.rapid_move_window, self.odds_threshold)
+        
+        # One alert per match, so moves on different matches are never folded together;
+        # each payload is bounded to the match's largest max_alert_samples moves
+        per_match = {}
+        counts = Counter()
+        for i in np.argsort(magnitudes)[::-1].tolist():
+            change = odds_changes[indices[i]]
+            counts[change.match_id] += 1
+            moves = per_match.setdefault(change.match_id, [])
+            if len(moves) < self.max_alert_samples:
+                moves.append({
+                    'match_id': change.match_id,
+                    'market_type': change.market_type,
+                    'selection': change.selection,
+                    'magnitude': float(magnitudes[i]),
+                    'timespan': float(elapsed[indices[i]])
+                })
+        
+        for match_id, moves in per_match.items():
+            self._create_alert('rapid_odds_changes', 'HIGH',
+                               f"Detected {counts[match_id]} rapid odds changes for match {match_id}", moves,
+                               captured_at=results.get('last_capture_time'), subject=match_id)
 
     def _detect_user_patterns(self, results: dict):
         """Detect suspicious user behavior patterns"""
-        api_calls = results.get('api_calls', {})
+        api_calls = results.get('api_calls') or SpaceSavingCounter()
         
-        # Detect high-frequency API usage
+        # Detect high-frequency API usage: endpoints seen this cycle whose
+        # rate over the last minute of capture time exceeds the threshold
         suspicious_endpoints = []
         for endpoint, count in api_calls.items():
-            if count > self.frequency_threshold:
+            per_minute = self.rate_tracker.per_minute(('endpoint', endpoint))
+            if per_minute > self.frequency_threshold:
                 suspicious_endpoints.append({
                     'endpoint': endpoint,
-                    'frequency': count,
+                    'frequency': per_minute,
+                    'rates': self.rate_tracker.rates(('endpoint', endpoint)),
+                    'cycle_count': count,
+                    'cycle_count_error': api_calls.error(endpoint),
                     'type': 'high_frequency_api'
                 })
         
-        if suspicious_endpoints:
-            results['suspicious_activity'].extend(suspicious_endpoints)
-            self._create_alert('high_frequency_api', 'MEDIUM', f"Detected {len(suspicious_endpoints)} high-frequency API endpoints", suspicious_endpoints)
+        results['suspicious_activity'].extend(suspicious_endpoints)
+        for entry in suspicious_endpoints:
+            self._create_alert('high_frequency_api', 'MEDIUM',
+                               f"High-frequency API endpoint {entry['endpoint']}: {entry['frequency']:.0f} calls/min", entry,
+                               captured_at=results.get('last_capture_time'), subject=entry['endpoint'])
 
     def _detect_anomalies(self, results: dict):
         """Detect statistical anomalies in betting patterns"""
-        # Simple anomaly detection based on frequency
-        betting_events = results.get('betting_events', 0)
-        
-        if betting_events > 100:  # Threshold for unusual activity
-            self._create_alert('high_betting_activity', 'MEDIUM', f"Unusually high betting activity: {betting_events} events", {
-                'event_count': betting_events,
-                'threshold': 100
-            })
-
-    def _create_alert(self, alert_type: str, severity: str, description: str, data: any):
-        """Create and store pattern alert"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Betting events per minute over the last minute of capture time
+        if not results.get('betting_events'):
+            return
+        per_minute = self.rate_tracker.per_minute(('category', 'betting'))
         
-        cursor.execute("""
-            INSERT INTO pattern_alerts (timestamp, alert_type, severity, description, data)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            datetime.now().isoformat(),
+        # The rate is engine-wide, so the alert has the one 'global' subject
+        if per_minute > self.betting_rate_threshold:
+            self._create_alert('high_betting_activity', 'MEDIUM', f"Unusually high betting activity: {per_minute:.0f} events/min", {
+                'event_count': results['betting_events'],
+                'events_per_minute': per_minute,
+                'rates': self.rate_tracker.rates(('category', 'betting')),
+                'threshold': self.betting_rate_threshold
+            }, captured_at=results.get('last_capture_time'), subject='global')
+
+    def _summarize_quic_traffic(self, results: dict):
+        """Record HTTP/3 traffic attributed to tracked domains as competitor activity"""
+        seen = datetime.fromtimestamp(results.get('last_capture_time') or time.time())
+        for server_name, (packets, total_bytes, new_flows) in results.get('quic_traffic', {}).items():
+            if any(domain in server_name for domain in self.competitor_domains):
+                results.setdefault('competitor_activity', []).append(CompetitorActivity(
+                    domain=server_name,
+                    timestamp=seen,
+                    activity_type='http3_traffic',
+                    frequency=packets,
+                    details={'bytes': total_bytes, 'new_flows': new_flows}
+                ))
+
+    def _create_alert(self, alert_type: str, severity: str, description: str, data: any,
+                      captured_at: Optional[float] = None, subject: str = 'global'):
+        """Create and store pattern alert, stamped with the capture time of the triggering data
+        
+        Alerts are fingerprinted by type and subject (an endpoint, a match or
+        'global'). A repeat within alert_suppression_window seconds of the
+        previous occurrence only bumps the stored alert's occurrence count.
+        """
+        now = datetime.fromtimestamp(captured_at) if captured_at else datetime.now()
+        fingerprint = f"{alert_type}:{subject}"
+        
+        repeat = self.alert_suppressor.repeat(fingerprint, now.timestamp())
+        if repeat is not None:
+            self.store.add('alert_occurrences', [(
+                repeat.occurrences,
+                int(repeat.last_seen * 1000),
+                fingerprint,
+                repeat.first_seen_ms
+            )])
+            logger.debug(f"ALERT [{severity}] {alert_type} repeated ({repeat.occurrences}x): {description}")
+            return
+        
+        self.alert_suppressor.open(fingerprint, epoch_ms(now), now.timestamp())
+        self.store.add('pattern_alerts', [(
+            now.isoformat(),
             alert_type,
             severity,
             description,
-            json.dumps(data, default=str)
-        ))
-        
-        conn.commit()
-        conn.close()
+            json_codec.dumps(data),
+            epoch_ms(now),
+            fingerprint,
+            1,
+            epoch_ms(now)
+        )])
+        self.report_aggregates.add_alert(now.timestamp(), now.isoformat(), alert_type, severity, description)
         
         logger.warning(f"ALERT [{severity}] {alert_type}: {description}")
 
-    def generate_intelligence_report(self) -> str:
-        """Generate comprehensive intelligence report"""
-        conn = sqlite3.connect(self.db_path)
+    def _load_open_alerts(self):
+        """Reopen alerts stored within the suppression window, so a restart does not re-raise them"""
+        since = epoch_ms(datetime.now()) - int(self.alert_suppressor.window * 1000)
+        for fingerprint, first_seen_ms, occurrences, last_seen_ms in self.store.execute("""
+            SELECT fingerprint, ts_epoch_ms, occurrences, last_seen_epoch_ms FROM pattern_alerts
+            WHERE fingerprint IS NOT NULL AND last_seen_epoch_ms > ?
+            ORDER BY last_seen_epoch_ms
+        """, (since,)):
+            self.alert_suppressor.open(fingerprint, first_seen_ms, last_seen_ms / 1000, occurrences)
+
+    def _load_report_aggregates(self):
+        """Seed the report aggregates with the rows already stored in the window"""
+        aggregates = self.report_aggregates
+        since = epoch_ms(datetime.now()) - aggregates.window_seconds * 1000
         
-        # Get recent data
-        odds_df = pd.read_sql_query("""
-            SELECT * FROM odds_changes 
-            WHERE timestamp > datetime('now', '-1 hour')
-            ORDER BY timestamp DESC
-        """, conn)
+        for ts, market_type, magnitude in self.store.execute("""
+            SELECT ts_epoch_ms, market_type, change_magnitude FROM odds_changes
+            WHERE ts_epoch_ms > ?
+        """, (since,)):
+            aggregates.add_odds_change(ts / 1000, market_type, magnitude or 0.0)
+        
+        for ts, timestamp, alert_type, severity, description in self.store.execute("""
+            SELECT ts_epoch_ms, timestamp, alert_type, severity, description FROM pattern_alerts
+            WHERE ts_epoch_ms > ?
+            ORDER BY ts_epoch_ms
+        """, (since,)):
+            aggregates.add_alert(ts / 1000, timestamp, alert_type, severity, description)
+
+    def generate_intelligence_report(self) -> str:
+        """Generate comprehensive intelligence report
         
-        alerts_df = pd.read_sql_query("""
-            SELECT * FROM pattern_alerts 
-            WHERE timestamp > datetime('now', '-1 hour')
-            ORDER BY timestamp DESC
-        """, conn)
+        Rendered from the running aggregates; the previous report is returned
+        unchanged when nothing in the window has changed since.
+        """
+        aggregates = self.report_aggregates
+        aggregates.expire()
+        if not aggregates.dirty and self._last_report is not None:
+            return self._last_report
         
-        conn.close()
+        totals = aggregates.snapshot()
+        odds_count = totals['odds_changes']
+        severities = totals['severities']
+        alerts_total = sum(severities.values())
+        recent_alerts = pd.DataFrame(
+            [alert[1:] for alert in totals['recent_alerts']],
+            columns=['timestamp', 'alert_type', 'severity', 'description']
+        )
         
         report = f"""
 # Machine Learning Pattern Analysis Report
 ## Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 ### Odds Analysis Summary
-- Total odds changes detected: {len(odds_df)}
-- Rapid changes (>10%): {len(odds_df[odds_df['change_magnitude'] > 0.1])}
-- Most active markets: {odds_df['market_type'].value_counts().to_dict() if not odds_df.empty else 'None'}
+- Total odds changes detected: {odds_count}
+- Rapid changes (>10%): {totals['rapid_changes']}
+- Most active markets: {dict(totals['markets'].most_common()) if odds_count else 'None'}
 
 ### Alert Summary
-- Total alerts: {len(alerts_df)}
-- High severity alerts: {len(alerts_df[alerts_df['severity'] == 'HIGH'])}
-- Medium severity alerts: {len(alerts_df[alerts_df['severity'] == 'MEDIUM'])}
+- Total alerts: {alerts_total}
+- High severity alerts: {severities['HIGH']}
+- Medium severity alerts: {severities['MEDIUM']}
 
 ### Recent Alerts
-{alerts_df[['timestamp', 'alert_type', 'severity', 'description']].to_string(index=False) if not alerts_df.empty else 'No recent alerts'}
+{recent_alerts.to_string(index=False) if not recent_alerts.empty else 'No recent alerts'}
 
 ### Pattern Insights
-- **Odds Volatility**: {'High' if len(odds_df) > 50 else 'Normal'}
-- **API Activity**: {'Suspicious' if len(alerts_df[alerts_df['alert_type'] == 'high_frequency_api']) > 0 else 'Normal'}
-- **Betting Volume**: {'High' if len(odds_df) > 100 else 'Normal'}
+- **Odds Volatility**: {'High' if odds_count > 50 else 'Normal'}
+- **API Activity**: {'Suspicious' if totals['alert_types']['high_frequency_api'] > 0 else 'Normal'}
+- **Betting Volume**: {'High' if odds_count > 100 else 'Normal'}
 
 ---
 Generated by ML Pattern Analysis Engine v2.0
         """
         
+        aggregates.dirty = False
+        self._last_report = report
         return report
 
-    async def start_realtime_analysis(self, packets_source: str):
-        """Start real-time pattern analysis"""
+    def _get_tailer(self, packets_file: str) -> PacketFileTailer:
+        """Return the tailer for a file, resuming from its stored checkpoint"""
+        tailer = self.tailers.get(packets_file)
+        if tailer is None:
+            row = self.store.execute(
+                "SELECT inode, offset FROM ingest_checkpoints WHERE path = ?",
+                (packets_file,)
+            ).fetchone()
+            
+            tailer = PacketFileTailer(packets_file, *row) if row else PacketFileTailer(packets_file)
+            if row:
+                logger.info(f"Resuming {packets_file} from byte {tailer.offset}")
+            self.tailers[packets_file] = tailer
+        return tailer
+
+    def analyze_new_packets(self, packets_file: str) -> Optional[Dict]:
+        """Analyze only the packets appended since the last checkpoint"""
+        tailer = self._get_tailer(packets_file)
+        if not tailer.has_new_data():
+            return None
+        
+        offset = tailer.offset
+        results = self.analyze_packet_lines(tailer.iter_new_lines())
+        if tailer.offset == offset:
+            return None  # Only an unterminated trailing line so far
+        results['checkpoints'] = [tailer]
+        return results
+
+    def _handle_results(self, results: Dict):
+        """Store a batch of results and report on significant activity"""
+        if results['total_packets'] > 0:
+            logger.info(f"Analyzed {results['total_packets']} new packets, found {results['betting_events']} betting events")
+            logger.debug(f"URI classifier cache: {self.uri_classifier.stats()}")
+        
+        # Store results together with the advanced checkpoints
+        self._store_analysis_results(results)
+        
+        # Generate a report while betting activity is significant, at most once per report_interval;
+        # a rate rather than a per-batch count, since a poll only sees half a second of traffic
+        betting_rate = self.rate_tracker.per_minute(('category', 'betting'))
+        now = time.monotonic()
+        due = self._last_report_saved_at is None or now - self._last_report_saved_at >= self.report_interval
+        if due and betting_rate > self.report_betting_rate:
+            report = self.generate_intelligence_report()
+            self._save_report(report)
+            self._last_report_saved_at = now
+
+    async def start_realtime_analysis(self, packets_source: str, max_workers: Optional[int] = None):
+        """Start real-time pattern analysis
+        
+        packets_source may be a glob; session files that appear later are
+        picked up on the next poll. Existing backlog is parsed in parallel first.
+        """
         logger.info("Starting real-time pattern analysis...")
         
-        while True:
-            try:
-                if os.path.exists(packets_source):
-                    results = self.analyze_http_packets(packets_source)
+        loop = asyncio.get_running_loop()
+        backfill = await loop.run_in_executor(None, self.analyze_sessions, packets_source, max_workers)
+        if backfill['checkpoints']:
+            self._handle_results(backfill)
+        
+        try:
+            while True:
+                try:
+                    for packets_file in discover_packet_files(packets_source):
+                        results = self.analyze_new_packets(packets_file)
+                        if results:
+                            self._handle_results(results)
                     
-                    if results['total_packets'] > 0:
-                        logger.info(f"Analyzed {results['total_packets']} packets, found {results['betting_events']} betting events")
-                        
-                        # Store results
-                        self._store_analysis_results(results)
-                        
-                        # Generate report if significant activity
-                        if results['betting_events'] > 10:
-                            report = self.generate_intelligence_report()
-                            self._save_report(report)
+                    self.store.maybe_flush()
+                    await asyncio.sleep(self.poll_interval)
                     
-                await asyncio.sleep(30)  # Analyze every 30 seconds
-                
-            except Exception as e:
-                logger.error(f"Error in real-time analysis: {e}")
-                await asyncio.sleep(60)
+                except Exception as e:
+                    logger.error(f"Error in real-time analysis: {e}")
+                    await asyncio.sleep(60)
+        finally:
+            self.store.flush()
 
     def _store_analysis_results(self, results: dict):
-        """Store analysis results in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Queue analysis results as one unit of the next group commit
+        
+        Rows and ingest checkpoints are queued together and only then
+        offered to maybe_flush, so they always commit in the same
+        transaction. The odds archive is appended once that has committed.
+        """
+        odds_changes = results.get('odds_changes', [])
+        rows = {}
+        rows['odds_changes'] = [(
+            odds_change.timestamp.isoformat(),
+            odds_change.match_id,
+            odds_change.market_type,
+            odds_change.old_odds,
+            odds_change.new_odds,
+            odds_change.change_magnitude,
+            odds_change.source_ip,
+            odds_change.api_endpoint,
+            epoch_ms(odds_change.timestamp)
+        ) for odds_change in odds_changes]
         
-        # Store odds changes
-        for odds_change in results.get('odds_changes', []):
-            cursor.execute("""
-                INSERT INTO odds_changes 
-                (timestamp, match_id, market_type, old_odds, new_odds, change_magnitude, source_ip, api_endpoint)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                odds_change.timestamp.isoformat(),
-                odds_change.match_id,
-                odds_change.market_type,
-                odds_change.old_odds,
-                odds_change.new_odds,
-                odds_change.change_magnitude,
-                odds_change.source_ip,
-                odds_change.api_endpoint
-            ))
-        
-        # Store competitor activity
-        for activity in results.get('competitor_activity', []):
-            cursor.execute("""
-                INSERT INTO competitor_activity (domain, timestamp, activity_type, frequency, details)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                activity.domain,
-                activity.timestamp.isoformat(),
-                activity.activity_type,
-                activity.frequency,
-                json.dumps(activity.details)
-            ))
+        rows['competitor_activity'] = [(
+            activity.domain,
+            activity.timestamp.isoformat(),
+            activity.activity_type,
+            activity.frequency,
+            json_codec.dumps(activity.details),
+            epoch_ms(activity.timestamp)
+        ) for activity in results.get('competitor_activity', [])]
         
-        conn.commit()
-        conn.close()
+        # Checkpoints commit in the same transaction as the rows above
+        rows['ingest_checkpoints'] = [
+            (tailer.path, tailer.inode, tailer.offset, datetime.now().isoformat())
+            for tailer in results.get('checkpoints', [])
+        ]
+        
+        def archive_odds_changes():
+            self.archive.append(
+                [epoch_ms(c.timestamp) for c in odds_changes],
+                [c.match_id for c in odds_changes],
+                [c.market_type for c in odds_changes],
+                [c.old_odds for c in odds_changes],
+                [c.new_odds for c in odds_changes],
+                [c.change_magnitude for c in odds_changes]
+            )
+        
+        self.store.add_many(rows, after_commit=archive_odds_changes if odds_changes else None)
+        
+        for odds_change in odds_changes:
+            self.report_aggregates.add_odds_change(
+                odds_change.timestamp.timestamp(), odds_change.market_type, odds_change.change_magnitude
+            )
+        
+        self.store.maybe_flush()
+
+    def close(self):
+        """Flush buffered rows and release the database connection"""
+        self.store.close()
 
     def _save_report(self, report: str):
-        """Save intelligence report to file"""
+        """Save intelligence report to file, skipping a report identical to the last one saved"""
+        if report is self._saved_report:
+            return
+        
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"competitive_intel/ml_intelligence_report_{timestamp}.md"
         
@@ -476,6 +1693,7 @@ Generated by ML Pattern Analysis Engine v2.0
         with open(filename, 'w') as f:
             f.write(report)
         
+        self._saved_report = report
         logger.info(f"Intelligence report saved: {filename}")
 
 class WebSocketAnalysisServer:
@@ -499,7 +1717,7 @@ class WebSocketAnalysisServer:
     async def broadcast_analysis(self, analysis_data: dict):
         """Broadcast analysis results to all connected clients"""
         if self.clients:
-            message = json.dumps(analysis_data, default=str)
+            message = json_codec.dumps(analysis_data)
             await asyncio.gather(
                 *[client.send(message) for client in self.clients],
                 return_exceptions=True
@@ -537,6 +1755,8 @@ def main():
         logger.info("Analysis engine stopped by user")
     except Exception as e:
         logger.error(f"Analysis engine error: {e}")
+    finally:
+        engine.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+"""
+Phase 2: Columnar Odds History Archive
+Append-only, day-sharded NumPy column files for odds changes, read back through np.memmap
+"""
+
+import logging
+import os
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Column name -> on-disk dtype (little-endian, fixed width)
+COLUMNS = {
+    'ts': np.dtype('<i8'),         # Epoch milliseconds
+    'match': np.dtype('<i4'),      # Index into match_ids.txt
+    'market': np.dtype('<i2'),     # Index into markets.txt
+    'old_odds': np.dtype('<f4'),
+    'new_odds': np.dtype('<f4'),
+    'magnitude': np.dtype('<f4'),
+}
+
+SEGMENT_MS = 86400 * 1000  # One segment per UTC day
+UNSORTED_MARKER = 'UNSORTED'
+
+class _StringTable:
+    """Append-only interned string table stored one value per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.values: List[str] = []
+        self.index: Dict[str, int] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self.index.setdefault(line.rstrip('\n'), len(self.values))
+                    self.values.append(line.rstrip('\n'))
+
+    def intern(self, values) -> np.ndarray:
+        """Codes for values, appending unseen ones to the table file first"""
+        new = []
+        codes = np.empty(len(values), dtype=np.int64)
+        for i, value in enumerate(values):
+            value = value.replace('\n', ' ')
+            code = self.index.get(value)
+            if code is None:
+                code = self.index[value] = len(self.values)
+                self.values.append(value)
+                new.append(value)
+            codes[i] = code
+        if new:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(f"{value}\n" for value in new))
+        return codes
+
+class OddsArchive:
+    """Append-only columnar archive of odds changes
+
+    Each UTC day is a segment directory holding one raw file per column.
+    Rows are appended in time order within a batch; a segment that received
+    an older batch after a newer one is marked UNSORTED and scanned with a
+    mask instead of a binary search.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._matches = None
+        self._markets = None
+        self._last_ts = {}
+
+    def _load_tables(self):
+        if self._matches is None:
+            os.makedirs(os.path.join(self.path, 'segments'), exist_ok=True)
+            self._matches = _StringTable(os.path.join(self.path, 'match_ids.txt'))
+            self._markets = _StringTable(os.path.join(self.path, 'markets.txt'))
+
+    @property
+    def match_ids(self) -> List[str]:
+        self._load_tables()
+        return self._matches.values
+
+    @property
+    def markets(self) -> List[str]:
+        self._load_tables()
+        return self._markets.values
+
+    def _segment_dir(self, segment: int) -> str:
+        day = np.datetime64(segment * SEGMENT_MS, 'ms').astype('datetime64[D]')
+        return os.path.join(self.path, 'segments', str(day).replace('-', ''))
+
+    def _segment_rows(self, segment_dir: str) -> int:
+        """Complete rows in a segment; a torn append leaves some columns longer"""
+        sizes = []
+        for name, dtype in COLUMNS.items():
+            column = os.path.join(segment_dir, f"{name}.bin")
+            sizes.append(os.path.getsize(column) // dtype.itemsize if os.path.exists(column) else 0)
+        return min(sizes)
+
+    def append(self, ts_ms, match_ids, markets, old_odds, new_odds, magnitudes):
+        """Append a batch of odds changes given as equal-length sequences"""
+        if not len(ts_ms):
+            return
+        self._load_tables()
+
+        ts_ms = np.asarray(ts_ms, dtype=COLUMNS['ts'])
+        order = np.argsort(ts_ms, kind='stable')
+        columns = {
+            'ts': ts_ms[order],
+            'match': self._matches.intern(match_ids)[order].astype(COLUMNS['match']),
+            'market': self._markets.intern(markets)[order].astype(COLUMNS['market']),
+            'old_odds': np.asarray(old_odds, dtype=COLUMNS['old_odds'])[order],
+            'new_odds': np.asarray(new_odds, dtype=COLUMNS['new_odds'])[order],
+            'magnitude': np.asarray(magnitudes, dtype=COLUMNS['magnitude'])[order],
+        }
+
+        segments = columns['ts'] // SEGMENT_MS
+        bounds = np.flatnonzero(np.diff(segments)) + 1
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(segments)]):
+            self._append_segment(int(segments[lo]), {name: col[lo:hi] for name, col in columns.items()})
+
+    def _append_segment(self, segment: int, columns: Dict[str, np.ndarray]):
+        segment_dir = self._segment_dir(segment)
+        if segment not in self._last_ts:
+            os.makedirs(segment_dir, exist_ok=True)
+            rows = self._segment_rows(segment_dir)
+            # Drop any partially written row so all columns line up again
+            for name, dtype in COLUMNS.items():
+                column = os.path.join(segment_dir, f"{name}.bin")
+                if os.path.exists(column) and os.path.getsize(column) != rows * dtype.itemsize:
+                    os.truncate(column, rows * dtype.itemsize)
+            ts = self._memmap(segment_dir, 'ts', rows)
+            self._last_ts[segment] = int(ts[-1]) if rows else None
+
+        last = self._last_ts[segment]
+        if last is not None and columns['ts'][0] < last:
+            open(os.path.join(segment_dir, UNSORTED_MARKER), 'a').close()
+
+        for name, values in columns.items():
+            with open(os.path.join(segment_dir, f"{name}.bin"), 'ab') as f:
+                f.write(values.tobytes())
+        newest = int(columns['ts'][-1])
+        self._last_ts[segment] = newest if last is None else max(last, newest)
+
+    def _memmap(self, segment_dir: str, name: str, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.memmap(os.path.join(segment_dir, f"{name}.bin"), dtype=COLUMNS[name], mode='r', shape=(rows,))
+
+    def iter_segments(self, start_ms: int, end_ms: int) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield column arrays per segment for rows with start_ms <= ts < end_ms
+
+        Sorted segments yield memmap slices (zero-copy); UNSORTED segments
+        yield masked copies.
+        """
+        segments_dir = os.path.join(self.path, 'segments')
+        names = sorted(os.listdir(segments_dir)) if os.path.isdir(segments_dir) else []
+        for name in names:
+            day = np.datetime64(f"{name[:4]}-{name[4:6]}-{name[6:8]}", 'D')
+            segment = int(day.astype('datetime64[ms]').astype(np.int64)) // SEGMENT_MS
+            if not start_ms // SEGMENT_MS <= segment <= (end_ms - 1) // SEGMENT_MS:
+                continue
+            segment_dir = os.path.join(segments_dir, name)
+            rows = self._segment_rows(segment_dir)
+            if rows == 0:
+                continue
+
+            columns = {name: self._memmap(segment_dir, name, rows) for name in COLUMNS}
+            ts = columns['ts']
+            if os.path.exists(os.path.join(segment_dir, UNSORTED_MARKER)):
+                mask = (ts >= start_ms) & (ts < end_ms)
+                yield {name: col[mask] for name, col in columns.items()}
+            else:
+                lo, hi = np.searchsorted(ts, [start_ms, end_ms], side='left')
+                if hi > lo:
+                    yield {name: col[lo:hi] for name, col in columns.items()}
+
+    def scan(self, start_ms: int, end_ms: int, match_id: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Concatenate all rows in [start_ms, end_ms), optionally for a single match"""
+        code = None
+        if match_id is not None:
+            self._load_tables()
+            code = self._matches.index.get(match_id)
+            if code is None:
+                return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+        parts = []
+        for columns in self.iter_segments(start_ms, end_ms):
+            if code is not None:
+                keep = columns['match'] == code
+                columns = {name: col[keep] for name, col in columns.items()}
+            parts.append(columns)
+
+        if not parts:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        return {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
@@ -209,17 +209,25 @@ analyze_realtime_traffic() {
             # Analyze latest packets
             tshark -r "$fifo_file" -T json \
                 -e frame.time \
+                -e frame.time_epoch \
+                -e frame.len \
                 -e ip.src \
                 -e ip.dst \
                 -e tcp.dstport \
                 -e udp.dstport \
                 -e quic.connection.id \
+                -e quic.dcid \
+                -e quic.scid \
+                -e quic.header_form \
+                -e quic.long.packet_type \
                 -e http.request.method \
                 -e http.request.uri \
                 -e http.response.code \
                 -e tls.handshake.extensions_server_name \
                 2>/dev/null | \
-            jq -c '.[] | select(.["_source"]["layers"] | has("quic") or has("http") or has("tls"))' \
+            # With -e, layers are flat field keys ("quic.dcid": [...]), not protocol objects
+            jq -c '.[] | select(.["_source"]["layers"] | has("quic.header_form") or has("quic.dcid") or has("quic.connection.id")
+                or has("http.request.uri") or has("http.response.code") or has("tls.handshake.extensions_server_name"))' \
                 >> "$analysis_output/realtime_packets.jsonl" 2>/dev/null
             
             # Trigger pattern analysis every 30 seconds
@@ -0,0 +1,84 @@
+"""
+RollingStats and the detector baseline checked against exact NumPy statistics over the same window
+
+Mean and std are exact up to float rounding. The 95th percentile is a P² estimate, so it is held
+to within P95_TOLERANCE window standard deviations of np.percentile on stationary inputs.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from event_detection_system import EventDetector, RollingStats
+
+WINDOW = 1000
+P95_TOLERANCE = 0.5  # In window standard deviations
+
+DISTRIBUTIONS = {
+    'normal': lambda rng, n: rng.normal(50.0, 5.0, n),
+    'uniform': lambda rng, n: rng.uniform(0.0, 100.0, n),
+    'exponential': lambda rng, n: rng.exponential(10.0, n),
+}
+
+def assert_matches_window(mean, std, percentile, window):
+    scale = max(1.0, abs(window.mean()))
+    assert abs(mean - window.mean()) <= 1e-9 * scale
+    assert abs(std - window.std()) <= 1e-9 * scale
+    assert abs(percentile - np.percentile(window, 95)) <= P95_TOLERANCE * window.std()
+
+@pytest.mark.parametrize('name', sorted(DISTRIBUTIONS))
+def test_add_matches_numpy(name):
+    values = DISTRIBUTIONS[name](np.random.default_rng(0), 5 * WINDOW)
+    rolling = RollingStats(WINDOW, 0.95)
+    for seq, value in enumerate(values, 1):
+        rolling.add(seq, float(value))
+        if seq >= WINDOW and seq % 50 == 0:
+            window = values[seq - WINDOW:seq]
+            assert rolling.count == WINDOW
+            assert_matches_window(rolling.mean, rolling.std, rolling.percentile, window)
+
+@pytest.mark.parametrize('name', sorted(DISTRIBUTIONS))
+def test_extend_matches_numpy(name):
+    values = DISTRIBUTIONS[name](np.random.default_rng(1), 5 * WINDOW)
+    rolling = RollingStats(WINDOW, 0.95)
+    seq = 1
+    for block in np.array_split(values, 37):
+        rolling.extend(seq, block)
+        seq += len(block)
+        if seq > WINDOW:
+            window = values[max(0, seq - 1 - WINDOW):seq - 1]
+            assert_matches_window(rolling.mean, rolling.std, rolling.percentile, window)
+
+def test_update_baseline_matches_numpy():
+    rng = np.random.default_rng(2)
+    requests = rng.normal(200.0, 20.0, 3 * WINDOW)
+    latency = rng.exponential(0.3, 3 * WINDOW)
+    detector = EventDetector()
+    for i in range(len(requests)):
+        detector.update_baseline({'requests': requests[i], 'latency': latency[i]})
+
+    for metric, values in (('requests', requests), ('latency', latency)):
+        baseline = detector.baseline_metrics[metric]
+        window = values[-detector.baseline_window:]
+        assert_matches_window(baseline['mean'], baseline['std'], baseline['percentile_95'], window)
+
+def test_update_baseline_batch_matches_per_record():
+    rng = np.random.default_rng(3)
+    values = rng.normal(10.0, 2.0, 2500)
+    per_record = EventDetector()
+    for value in values:
+        per_record.update_baseline({'value': value})
+    batched = EventDetector()
+    for block in np.array_split(values, 10):
+        batched.update_baseline_batch({'value': block})
+
+    expected = per_record.baseline_metrics['value']
+    actual = batched.baseline_metrics['value']
+    assert abs(actual['mean'] - expected['mean']) <= 1e-9 * abs(expected['mean'])
+    assert abs(actual['std'] - expected['std']) <= 1e-9 * abs(expected['mean'])
+    assert abs(actual['percentile_95'] - expected['percentile_95']) <= P95_TOLERANCE * expected['std']